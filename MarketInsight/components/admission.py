@@ -0,0 +1,189 @@
+import time
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable
+from config.config import (
+    ADMISSION_MAX_ACTIVE, ADMISSION_MAX_PER_THREAD, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER,
+)
+from MarketInsight.utils.metrics import ADMISSION_REJECTED, ADMISSION_WAIT, CHAT_CANCELLED
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Admission")
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of admitting a chat; carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted chat's slot; ``release`` is idempotent so every exit path can call it."""
+
+    def __init__(self, controller: "AdmissionController", thread_id: str):
+        self._controller = controller
+        self._thread_id = thread_id
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self._thread_id)
+
+
+class AdmissionController:
+    """Limits concurrent chats globally and per conversation thread.
+
+    Up to ``max_active`` chats run at once; further requests wait in a FIFO queue of
+    at most ``max_queue`` entries for up to ``queue_timeout`` seconds and are then
+    rejected with 503, as are requests arriving to a full queue. A thread that
+    already has ``max_per_thread`` chats running or queued is rejected with 429.
+    A finishing chat hands its slot directly to the oldest waiter. All state lives
+    on the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_active: int = ADMISSION_MAX_ACTIVE, max_per_thread: int = ADMISSION_MAX_PER_THREAD,
+                 max_queue: int = ADMISSION_MAX_QUEUE, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 retry_after: int = ADMISSION_RETRY_AFTER):
+        self.max_active = max_active
+        self.max_per_thread = max_per_thread
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._threads: dict[str, int] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.inc(reason)
+        return AdmissionRejected(status_code, detail, self.retry_after)
+
+    def _leave_thread(self, thread_id: str) -> None:
+        count = self._threads.get(thread_id, 0) - 1
+        if count > 0:
+            self._threads[thread_id] = count
+        else:
+            self._threads.pop(thread_id, None)
+
+    async def admit(self, thread_id: str) -> Ticket:
+        if self._threads.get(thread_id, 0) >= self.max_per_thread:
+            raise self._reject(429, "thread_busy", "A response for this conversation is already in progress.")
+
+        if self.active < self.max_active and not self.queued:
+            self.active += 1
+        else:
+            if self.queued >= self.max_queue:
+                raise self._reject(503, "queue_full", "The service is busy. Please try again shortly.")
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                self._leave_thread(thread_id)
+                if waiter.done():
+                    # The slot was handed over just as we gave up; pass it on
+                    self._release_slot()
+                else:
+                    waiter.cancel()
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                raise self._reject(503, "queue_timeout", "The service is busy. Please try again shortly.") from None
+            finally:
+                ADMISSION_WAIT.observe(time.perf_counter() - started)
+            self._leave_thread(thread_id)
+
+        self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+        return Ticket(self, thread_id)
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _release(self, thread_id: str) -> None:
+        self._leave_thread(thread_id)
+        self._release_slot()
+
+    def stats(self) -> dict:
+        return {"active": self.active, "queued": self.queued}
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def supervise(stream: AsyncIterator[str], receive: Callable[[], Awaitable[dict]],
+                    timeout: float) -> AsyncIterator[str]:
+    """Yield ``stream``'s chunks, cancelling it when the client disconnects or after ``timeout`` seconds.
+
+    ``stream`` runs in its own task and ``receive`` (the ASGI receive channel) is
+    watched for ``http.disconnect``, so the agent run, including an LLM call or tool
+    step that has not produced output yet, is cancelled as soon as the client is gone
+    rather than when the next chunk fails to send. Hitting the deadline raises
+    ``TimeoutError`` after the chunks produced so far.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    reason = None
+
+    async def produce() -> None:
+        try:
+            async for chunk in stream:
+                queue.put_nowait(chunk)
+        except asyncio.CancelledError:
+            if reason == "deadline":
+                # A cut-off answer must not end like a complete one
+                queue.put_nowait(_Failure(TimeoutError(f"Agent run exceeded {timeout:g} seconds")))
+        except Exception as e:
+            queue.put_nowait(_Failure(e))
+        finally:
+            queue.put_nowait(done)
+
+    async def watch() -> None:
+        nonlocal reason
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        reason = "disconnect"
+        producer.cancel()
+
+    def expire() -> None:
+        nonlocal reason
+        reason = "deadline"
+        producer.cancel()
+
+    producer = asyncio.create_task(produce())
+    watcher = asyncio.create_task(watch())
+    timer = asyncio.get_running_loop().call_later(timeout, expire)
+    try:
+        while (item := await queue.get()) is not done:
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        timer.cancel()
+        watcher.cancel()
+        if reason is None and not producer.done():
+            # Closed early by the server, which noticed the disconnect first
+            reason = "disconnect"
+        producer.cancel()
+        if reason is not None:
+            CHAT_CANCELLED.inc(reason)
+            logger.info("Agent run cancelled: %s", "client disconnected" if reason == "disconnect" else "deadline exceeded")
+
+
+admission = AdmissionController()
@@ -1,25 +1,86 @@
-import os
+import asyncio
+import threading
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from MarketInsight.utils.tools import *
 from MarketInsight.utils.logger import get_logger
-from langgraph.checkpoint.memory import MemorySaver
-from langchain.agents import create_agent
+from MarketInsight.utils.startup import startup
 
 load_dotenv()
 logger = get_logger(__name__)
 
-model = ChatOpenAI(
-        model = "c1/openai/gpt-5/v-20250930",
-        base_url = "https://api.thesys.dev/v1/embed/"
-    )
+SYSTEM_PROMPT = "You are a professional stock market analyst. For every user query, first determine whether a relevant tool can provide accurate or real-time data. If an appropriate tool exists, you must use it before answering. If the user does not provide an exact stock ticker, use the available tool to identify or resolve the correct ticker when required. Only when no suitable tool applies should you respond using your own reasoning and general market knowledge. When several independent pieces of data are needed, request all of those tool calls together in a single step. Never guess, assume, or fabricate any financial data."
 
-agent = create_agent(
-    model,
-    tools = [get_stock_price, get_historical_data, get_stock_news, get_balance_sheet, get_income_statement, get_cash_flow,
-            get_company_info, get_dividends, get_splits, get_institutional_holders, get_major_shareholders,
-            get_mutual_fund_holders, get_insider_transactions, get_analyst_recommendations, get_analyst_recommendations_summary, get_ticker],
-    checkpointer = MemorySaver()
-)
+# Built on first use: importing langchain, the OpenAI client, yfinance and pandas
+# takes seconds and would otherwise delay the server (and /health) on cold starts.
+agent = None
+checkpointer = None
+_lock = threading.Lock()
 
-logger.info("Agent Initiated Successfully")
\ No newline at end of file
+
+def get_checkpointer():
+    global checkpointer
+    if checkpointer is None:
+        with _lock:
+            if checkpointer is None:
+                from MarketInsight.components.checkpointer import BoundedCheckpointer
+
+                checkpointer = BoundedCheckpointer()
+    return checkpointer
+
+
+def get_model():
+    with startup.phase("chat model"):
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+                model = "c1/openai/gpt-5/v-20250930",
+                base_url = "https://api.thesys.dev/v1/embed/"
+            )
+
+
+def get_tools() -> list:
+    with startup.phase("tools"):
+        from MarketInsight.utils import tools
+
+        return [tools.get_stock_price, tools.get_historical_data, tools.get_stock_news, tools.get_balance_sheet,
+                tools.get_income_statement, tools.get_cash_flow, tools.get_company_info, tools.get_dividends,
+                tools.get_splits, tools.get_institutional_holders, tools.get_major_shareholders,
+                tools.get_mutual_fund_holders, tools.get_insider_transactions, tools.get_analyst_recommendations,
+                tools.get_analyst_recommendations_summary, tools.get_ticker, tools.get_stock_prices,
+                tools.get_historical_data_batch, tools.get_technical_indicators,
+                tools.screen_stocks]
+
+
+def build_agent(chat_model, checkpointer):
+    """Assemble the agent graph around ``chat_model``; benchmarks pass a scripted model here."""
+    tools = get_tools()
+    with startup.phase("agent graph"):
+        from langchain.agents import create_agent
+        from MarketInsight.components.context import ContextWindowMiddleware
+        from MarketInsight.components.tool_execution import ToolConcurrencyMiddleware, ToolMetricsMiddleware
+
+        return create_agent(
+            chat_model,
+            tools = tools,
+            system_prompt = SYSTEM_PROMPT,
+            middleware = [ContextWindowMiddleware(), ToolMetricsMiddleware(), ToolConcurrencyMiddleware()],
+            checkpointer = checkpointer
+        )
+
+
+def get_agent():
+    """Return the agent, building it on the first call; concurrent callers share one build."""
+    global agent
+    if agent is None:
+        checkpointer = get_checkpointer()
+        with _lock:
+            if agent is None:
+                agent = build_agent(get_model(), checkpointer)
+                logger.info("Agent Initiated Successfully")
+    return agent
+
+
+async def aget_agent():
+    """``get_agent`` for the event loop: a pending build runs in the default executor."""
+    if agent is not None:
+        return agent
+    return await asyncio.get_running_loop().run_in_executor(None, get_agent)
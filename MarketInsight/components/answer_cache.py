@@ -0,0 +1,98 @@
+import re
+import asyncio
+from config.config import (
+    ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_MAX_TTL, ANSWER_CACHE_CHUNK_SIZE, ANSWER_CACHE_NO_DATA_TTL,
+)
+from MarketInsight.utils.cache import TTLCache, DATASET_TTLS, MISSING
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("AnswerCache")
+
+# yfinance dataset each tool reads, which decides how long an answer built on it stays fresh.
+# Tools mapped to None (ticker lookup) read no market data.
+TOOL_DATASETS = {
+    "get_stock_price": "info",
+    "get_stock_prices": "info",
+    "get_company_info": "info",
+    "get_historical_data": "history",
+    "get_historical_data_batch": "history",
+    "get_technical_indicators": "history",
+    "screen_stocks": "info",
+    "get_stock_news": "news",
+    "get_balance_sheet": "balance_sheet",
+    "get_income_statement": "financials",
+    "get_cash_flow": "cashflow",
+    "get_dividends": "dividends",
+    "get_splits": "splits",
+    "get_institutional_holders": "institutional_holders",
+    "get_major_shareholders": "major_holders",
+    "get_mutual_fund_holders": "mutualfund_holders",
+    "get_insider_transactions": "insider_transactions",
+    "get_analyst_recommendations": "recommendations",
+    "get_analyst_recommendations_summary": "recommendations_summary",
+    "get_ticker": None,
+}
+
+# Error strings tools return instead of raising, which end up in the streamed text
+TOOL_ERROR = re.compile(r"Error: (Failed to|Invalid) ")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower-case, drop punctuation (keeping ticker characters) and collapse whitespace."""
+    text = re.sub(r"[^\w\s.^&-]", " ", prompt.lower())
+    return " ".join(text.split()).strip(" .")
+
+
+def answer_ttl(tools_used: set[str]) -> float:
+    """Lifetime of an answer: the freshness of the most volatile dataset it used.
+
+    Answers that read no market data (only the ticker lookup, or no tool at all)
+    get the short ``ANSWER_CACHE_NO_DATA_TTL``.
+    """
+    ttls = []
+    for name in tools_used:
+        dataset = TOOL_DATASETS.get(name, "info")
+        if dataset is not None:
+            ttls.append(DATASET_TTLS[dataset])
+    return min(ttls + [ANSWER_CACHE_MAX_TTL]) if ttls else min(ANSWER_CACHE_NO_DATA_TTL, ANSWER_CACHE_MAX_TTL)
+
+
+class AnswerCache:
+    """Cache of complete chat responses for self-contained prompts.
+
+    Entries are keyed by the normalized prompt and store the exact streamed text,
+    the final answer and the tools the agent used; their TTL follows the freshness
+    class of those tools. Only first turns of a thread are cached or served, since
+    follow-up questions depend on the conversation, and answers built on a failed
+    tool call are never cached.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self._cache = TTLCache(max_entries=max_entries)
+
+    def get(self, prompt: str) -> dict | None:
+        entry = self._cache.get(normalize_prompt(prompt))
+        return None if entry is MISSING else entry
+
+    def put(self, prompt: str, streamed: str, answer: str, tools_used: set[str], tool_failed: bool = False) -> None:
+        if tool_failed or TOOL_ERROR.search(streamed):
+            logger.debug("Not caching answer for %r: a tool call failed", normalize_prompt(prompt))
+            return
+        ttl = answer_ttl(tools_used)
+        if ttl <= 0:
+            return
+        self._cache.set(normalize_prompt(prompt), {"streamed": streamed, "answer": answer, "tools": sorted(tools_used)}, ttl)
+        logger.debug("Cached answer for %r using %s for %ss", normalize_prompt(prompt), sorted(tools_used), ttl)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+async def replay(text: str, chunk_size: int = ANSWER_CACHE_CHUNK_SIZE):
+    """Stream a cached response in chunks so clients see the usual streaming contract."""
+    for i in range(0, len(text), chunk_size):
+        yield text[i:i + chunk_size]
+        await asyncio.sleep(0)
+
+
+answer_cache = AnswerCache()
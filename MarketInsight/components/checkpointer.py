@@ -0,0 +1,231 @@
+import time
+import zlib
+import asyncio
+import functools
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from langgraph.checkpoint.memory import InMemorySaver
+from config.config import CHECKPOINT_MAX_BYTES, CHECKPOINT_IDLE_TTL, CHECKPOINT_DB_PATH, CHECKPOINT_DB_TTL
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Checkpointer")
+
+
+class BoundedCheckpointer(InMemorySaver):
+    """InMemorySaver that keeps memory flat across many conversations.
+
+    * Only the latest checkpoint of each thread is kept (the app never reads
+      checkpoint history), together with the channel blobs it references.
+    * Threads idle for longer than ``idle_ttl`` seconds, and the least recently used
+      threads once ``max_bytes`` of serialized state is exceeded, are evicted.
+    * With ``db_path`` set, evicted threads are spilled to SQLite and loaded back on
+      their next access; ``close`` spills everything, so conversations survive restarts.
+    * The async API runs the sync methods in the loop's default executor, since
+      measuring, spilling and restoring pickle, compress and commit under a lock.
+    """
+
+    def __init__(self, max_bytes: int = CHECKPOINT_MAX_BYTES, idle_ttl: float = CHECKPOINT_IDLE_TTL,
+                 db_path: str = CHECKPOINT_DB_PATH, db_ttl: float = CHECKPOINT_DB_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.db_path = db_path
+        self.db_ttl = db_ttl
+        self._lock = threading.RLock()
+        # thread ID -> last access time, least recently used first
+        self._access: OrderedDict[str, float] = OrderedDict()
+        # (thread ID, checkpoint NS) -> channel -> version referenced by the latest checkpoint
+        self._versions: dict[tuple[str, str], dict] = {}
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._db = None
+
+    # ----------------------------------------------------------------------------
+    # SQLite spill tier
+    # ----------------------------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection | None:
+        if not self.db_path:
+            return None
+        if self._db is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, data BLOB, updated_at REAL)")
+            self._db.execute("DELETE FROM threads WHERE updated_at < ?", (time.time() - self.db_ttl,))
+            self._db.commit()
+        return self._db
+
+    def _snapshot(self, thread_id: str) -> dict:
+        storage = {ns: dict(checkpoints) for ns, checkpoints in self.storage.get(thread_id, {}).items()}
+        writes = {key: self.writes[key] for ns, checkpoints in storage.items()
+                  for key in ((thread_id, ns, cid) for cid in checkpoints) if key in self.writes}
+        versions = {ns: self._versions[(thread_id, ns)] for ns in storage if (thread_id, ns) in self._versions}
+        blobs = {key: self.blobs[key] for ns, channels in versions.items()
+                 for key in ((thread_id, ns, ch, v) for ch, v in channels.items()) if key in self.blobs}
+        return {"storage": storage, "writes": writes, "blobs": blobs, "versions": versions}
+
+    def _spill(self, thread_id: str) -> None:
+        db = self._connection()
+        if db is None or not self.storage.get(thread_id):
+            return
+        data = zlib.compress(pickle.dumps(self._snapshot(thread_id), protocol=pickle.HIGHEST_PROTOCOL))
+        db.execute("INSERT OR REPLACE INTO threads VALUES (?, ?, ?)", (thread_id, data, time.time()))
+        db.commit()
+
+    def _restore(self, thread_id: str) -> None:
+        db = self._connection()
+        if db is None:
+            return
+        row = db.execute("SELECT data FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+        if row is None:
+            return
+        snapshot = pickle.loads(zlib.decompress(row[0]))
+        for ns, checkpoints in snapshot["storage"].items():
+            self.storage[thread_id][ns] = checkpoints
+        for key, value in snapshot["writes"].items():
+            self.writes[key] = value
+        self.blobs.update(snapshot["blobs"])
+        for ns, channels in snapshot["versions"].items():
+            self._versions[(thread_id, ns)] = channels
+        logger.debug("Restored thread %s from %s", thread_id, self.db_path)
+
+    # ----------------------------------------------------------------------------
+    # Accounting and eviction
+    # ----------------------------------------------------------------------------
+    def _measure(self, thread_id: str) -> None:
+        snapshot = self._snapshot(thread_id)
+        size = sum(len(c[1]) + len(m[1]) for checkpoints in snapshot["storage"].values() for c, m, _ in checkpoints.values())
+        size += sum(len(w[2][1]) for writes in snapshot["writes"].values() for w in writes.values())
+        size += sum(len(b[1]) for b in snapshot["blobs"].values())
+        self._total_bytes += size - self._sizes.get(thread_id, 0)
+        self._sizes[thread_id] = size
+
+    def _drop(self, thread_id: str) -> None:
+        for ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for cid in checkpoints:
+                self.writes.pop((thread_id, ns, cid), None)
+            for ch, v in self._versions.pop((thread_id, ns), {}).items():
+                self.blobs.pop((thread_id, ns, ch, v), None)
+        self._total_bytes -= self._sizes.pop(thread_id, 0)
+        self._access.pop(thread_id, None)
+
+    def _evict(self, thread_id: str) -> None:
+        try:
+            self._spill(thread_id)
+        except Exception as e:
+            logger.error("Failed to spill thread %s: %s", thread_id, e)
+        self._drop(thread_id)
+
+    def _touch(self, thread_id: str) -> None:
+        """Mark a thread as used, loading it from disk if it was evicted, and evict others."""
+        if thread_id not in self._access:
+            if thread_id not in self.storage:
+                self._restore(thread_id)
+            self._measure(thread_id)
+        self._access[thread_id] = time.monotonic()
+        self._access.move_to_end(thread_id)
+
+        now = time.monotonic()
+        while self._access:
+            oldest, last_used = next(iter(self._access.items()))
+            if oldest == thread_id:
+                break
+            if now - last_used > self.idle_ttl or self._total_bytes > self.max_bytes:
+                self._evict(oldest)
+            else:
+                break
+
+    # ----------------------------------------------------------------------------
+    # Checkpointer API
+    # ----------------------------------------------------------------------------
+    def get_tuple(self, config):
+        with self._lock:
+            self._touch(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config:
+                self._touch(config["configurable"]["thread_id"])
+            return iter(list(super().list(config, filter=filter, before=before, limit=limit)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._touch(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            # Keep only the new checkpoint and the channel versions it references
+            checkpoints = self.storage[thread_id][checkpoint_ns]
+            for cid in [cid for cid in checkpoints if cid != checkpoint["id"]]:
+                del checkpoints[cid]
+                self.writes.pop((thread_id, checkpoint_ns, cid), None)
+            versions = self._versions.setdefault((thread_id, checkpoint_ns), {})
+            for ch, v in new_versions.items():
+                old = versions.get(ch)
+                if old is not None and old != v:
+                    self.blobs.pop((thread_id, checkpoint_ns, ch, old), None)
+                versions[ch] = v
+
+            self._measure(thread_id)
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._touch(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            self._measure(thread_id)
+
+    # InMemorySaver's async methods call the sync ones directly, on the event loop
+    async def _in_executor(self, method, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args, **kwargs))
+
+    async def aget_tuple(self, config):
+        return await self._in_executor(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in await self._in_executor(self.list, config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self._in_executor(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await self._in_executor(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._in_executor(self.delete_thread, thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(thread_id)
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+                db.commit()
+
+    # ----------------------------------------------------------------------------
+    # Reporting and shutdown
+    # ----------------------------------------------------------------------------
+    def thread_memory(self) -> dict[str, int]:
+        """Serialized bytes held in memory per thread."""
+        with self._lock:
+            return dict(self._sizes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"threads": len(self._access), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        """Spill every in-memory thread to disk (if enabled) and close the database."""
+        with self._lock:
+            if self._connection() is not None:
+                for thread_id in list(self._access):
+                    self._spill(thread_id)
+                self._db.close()
+                self._db = None
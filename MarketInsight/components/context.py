@@ -0,0 +1,94 @@
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from config.config import CONTEXT_TOKEN_BUDGET, STALE_TOOL_PREVIEW_CHARS
+from MarketInsight.utils.serializer import estimate_tokens
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Context")
+
+STALE_MARKER = "[Earlier result of"
+
+
+def _last_human_index(messages) -> int:
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return i
+    return 0
+
+
+def _message_tokens(message) -> int:
+    return estimate_tokens(message.text if hasattr(message, "text") else str(message.content)) + 4
+
+
+class ContextWindowMiddleware(AgentMiddleware):
+    """Keeps the prompt of long conversations close to the size of the first turn.
+
+    Before each model call the thread state is compacted in place: system messages
+    stored in the history (the system prompt is supplied by the agent on every call)
+    are removed, and tool results from previous turns are replaced by a short
+    reference, since the tools can be called again and are cached. The request sent
+    to the model is then trimmed to ``token_budget`` by dropping the oldest whole
+    turns, which keeps tool calls and their results paired.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, preview_chars: int = STALE_TOOL_PREVIEW_CHARS):
+        super().__init__()
+        self.token_budget = token_budget
+        self.preview_chars = preview_chars
+
+    def _compact(self, messages) -> list:
+        current_turn = _last_human_index(messages)
+        updates = []
+        for i, message in enumerate(messages):
+            if isinstance(message, SystemMessage) and message.id:
+                updates.append(RemoveMessage(id=message.id))
+            elif isinstance(message, ToolMessage) and i < current_turn and message.id:
+                content = str(message.content)
+                if len(content) <= self.preview_chars or content.startswith(STALE_MARKER):
+                    continue
+                preview = content[:self.preview_chars].replace("\n", " ")
+                compacted = f"{STALE_MARKER} {message.name or 'tool'}, {len(content)} chars; call again for all] {preview}"
+                # Results only slightly longer than the preview would not shrink
+                if len(compacted) >= len(content):
+                    continue
+                updates.append(ToolMessage(
+                    id=message.id,
+                    tool_call_id=message.tool_call_id,
+                    name=message.name,
+                    content=compacted,
+                ))
+        return updates
+
+    def before_model(self, state, runtime):
+        updates = self._compact(state["messages"])
+        if updates:
+            logger.debug("Compacted %s stale messages", len(updates))
+            return {"messages": updates}
+        return None
+
+    async def abefore_model(self, state, runtime):
+        return self.before_model(state, runtime)
+
+    def _trim(self, request):
+        messages = request.messages
+        budget = self.token_budget - (_message_tokens(request.system_message) if request.system_message else 0)
+        sizes = [_message_tokens(m) for m in messages]
+        total = sum(sizes)
+        if total <= budget:
+            return request
+
+        turn_starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        start = 0
+        for turn_start in turn_starts[1:]:
+            if total <= budget:
+                break
+            total -= sum(sizes[start:turn_start])
+            start = turn_start
+        logger.debug("Dropped %s messages from the prompt to fit %s tokens", start, self.token_budget)
+        return request.override(messages=messages[start:])
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._trim(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._trim(request))
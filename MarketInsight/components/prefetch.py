@@ -0,0 +1,169 @@
+import math
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait
+from config.config import (
+    PREFETCH_WATCHLIST, PREFETCH_WATCHLIST_PATH, PREFETCH_WATCHLIST_MIN_TTL, PREFETCH_DATASETS, PREFETCH_HOT_SIZE,
+    PREFETCH_MIN_SCORE, PREFETCH_INTERVAL, PREFETCH_WORKERS, PREFETCH_MAX_PER_CYCLE, PREFETCH_MIN_HEADROOM,
+)
+from MarketInsight.utils.cache import market_cache, DATASET_TTLS
+from MarketInsight.utils.popularity import popularity
+from MarketInsight.utils.upstream import upstream
+from MarketInsight.utils.metrics import PREFETCH_REFRESHES
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Prefetch")
+
+# Indices (^GSPC, ^NSEI, ...) have quotes and prices, but no financials, holders or news of their own
+INDEX_DATASETS = ("info", "history")
+
+
+def is_index(ticker: str) -> bool:
+    return ticker.startswith("^")
+
+
+def load_watchlist(path: str = PREFETCH_WATCHLIST_PATH, tickers: list[str] = PREFETCH_WATCHLIST) -> list[str]:
+    """``tickers`` (``PREFETCH_WATCHLIST`` by default) if set, otherwise one per line from ``path``."""
+    if tickers:
+        return list(tickers)
+    try:
+        lines = Path(path).read_text().splitlines()
+    except OSError as e:
+        logger.warning("Could not read watchlist %s: %s", path, e)
+        return []
+    return [line.strip().upper() for line in lines if line.strip() and not line.startswith("#")]
+
+
+class PrefetchScheduler:
+    """Keeps market data for currently popular tickers and the watchlist warm.
+
+    Every ``interval`` seconds a background thread finds the (ticker, dataset) cache
+    entries that are missing or expire before the next cycle and refreshes up to
+    ``max_per_cycle`` of them, soonest-expiring first, on a pool of ``workers``
+    threads through the same ``_fetch`` path the tools use. Popular tickers get every
+    dataset; watchlist tickers only the datasets cached for at least
+    ``watchlist_min_ttl`` seconds, so an idle service does not poll quotes for the
+    whole watchlist. Indices only get ``INDEX_DATASETS``. A cycle is skipped while the upstream rate limiter has less than
+    ``min_headroom`` of its burst left or the circuit is open, so user requests keep
+    priority.
+    """
+
+    def __init__(self, watchlist: list[str] | None = None, datasets: list[str] = PREFETCH_DATASETS,
+                 hot_size: int = PREFETCH_HOT_SIZE, min_score: float = PREFETCH_MIN_SCORE,
+                 interval: float = PREFETCH_INTERVAL, workers: int = PREFETCH_WORKERS,
+                 max_per_cycle: int = PREFETCH_MAX_PER_CYCLE, min_headroom: float = PREFETCH_MIN_HEADROOM,
+                 watchlist_min_ttl: float = PREFETCH_WATCHLIST_MIN_TTL):
+        self.watchlist = load_watchlist() if watchlist is None else watchlist
+        self.datasets = datasets
+        self.watchlist_datasets = [d for d in datasets if DATASET_TTLS[d] >= watchlist_min_ttl]
+        self.hot_size = hot_size
+        self.min_score = min_score
+        self.interval = interval
+        self.workers = workers
+        self.max_per_cycle = max_per_cycle
+        self.min_headroom = min_headroom
+        self._pending: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+    def hot_set(self) -> list[str]:
+        return list(dict.fromkeys(popularity.top(self.hot_size, self.min_score) + self.watchlist))
+
+    @staticmethod
+    def _pairs(tickers: list[str], datasets: list[str]) -> list[tuple[str, str]]:
+        return [(ticker, dataset) for ticker in tickers for dataset in datasets
+                if not is_index(ticker) or dataset in INDEX_DATASETS]
+
+    def tracked(self) -> list[tuple[str, str]]:
+        """(ticker, dataset) pairs kept warm: every dataset of popular tickers, long-lived ones of the watchlist."""
+        popular = popularity.top(self.hot_size, self.min_score)
+        pairs = self._pairs(popular, self.datasets) + self._pairs(self.watchlist, self.watchlist_datasets)
+        return list(dict.fromkeys(pairs))
+
+    def due(self, pairs: list[tuple[str, str]] | None = None) -> list[tuple[str, str]]:
+        """Tracked pairs missing from the cache or expiring before the next cycle, soonest first."""
+        # Refresh with a cycle of slack so entries are replaced before they expire
+        lead = self.interval * 1.5
+        candidates = []
+        with self._lock:
+            pending = set(self._pending)
+        for ticker, dataset in self.tracked() if pairs is None else pairs:
+            if (ticker, dataset) in pending:
+                continue
+            remaining = market_cache.expires_in((ticker, dataset))
+            if remaining is None or remaining < lead:
+                candidates.append((-math.inf if remaining is None else remaining, ticker, dataset))
+        return [(ticker, dataset) for _, ticker, dataset in sorted(candidates)]
+
+    def _refresh(self, ticker: str, dataset: str) -> None:
+        from MarketInsight.utils import tools
+
+        try:
+            tools._fetch(ticker, dataset, refresh=True)
+            PREFETCH_REFRESHES.inc(dataset, "ok")
+        except Exception as e:
+            PREFETCH_REFRESHES.inc(dataset, "error")
+            logger.debug("Prefetch of %s for %s failed: %s", dataset, ticker, e)
+        finally:
+            with self._lock:
+                self._pending.discard((ticker, dataset))
+
+    def _submit(self, items: list[tuple[str, str]]) -> list:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+        with self._lock:
+            self._pending.update(items)
+        return [self._pool.submit(self._refresh, ticker, dataset) for ticker, dataset in items]
+
+    def run_cycle(self) -> int:
+        """Schedule one round of refreshes and return how many were submitted."""
+        if upstream.breaker.state == "open":
+            return 0
+        if upstream.bucket.available() < upstream.bucket.capacity * self.min_headroom:
+            logger.debug("Skipping prefetch cycle: upstream rate limit headroom is low")
+            return 0
+        batch = self.due()[:self.max_per_cycle]
+        if batch:
+            self._submit(batch)
+            logger.debug("Prefetching %d entries", len(batch))
+        return len(batch)
+
+    def warm_up(self, timeout: float) -> int:
+        """Fetch every dataset of the watchlist that is missing or expiring, waiting up to ``timeout`` seconds."""
+        items = self.due(self._pairs(self.watchlist, self.datasets))
+        done, _ = wait(self._submit(items), timeout=timeout)
+        logger.info("Warmed up %d of %d watchlist entries", len(done), len(items))
+        return len(done)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logger.error("Prefetch cycle failed: %s", e)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+            self._thread.start()
+            logger.info("Prefetching %d watchlist tickers every %.0fs", len(self.watchlist), self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {"hot": len(self.hot_set()), "pending": pending}
+
+
+prefetcher = PrefetchScheduler()
@@ -0,0 +1,174 @@
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.config import (
+    SCREENER_UNIVERSE, SCREENER_UNIVERSE_PATH, SCREENER_REFRESH_INTERVAL, SCREENER_WORKERS, SCREENER_MAX_RESULTS,
+)
+from MarketInsight.components.prefetch import load_watchlist, is_index
+from MarketInsight.utils.upstream import upstream
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Screener")
+
+# yfinance info fields held in the snapshot, by column type
+TEXT_FIELDS = ["longName", "sector", "industry", "country", "currency"]
+NUMERIC_FIELDS = [
+    "marketCap", "currentPrice", "trailingPE", "forwardPE", "priceToBook", "dividendYield", "payoutRatio",
+    "profitMargins", "operatingMargins", "grossMargins", "returnOnEquity", "revenueGrowth", "earningsGrowth",
+    "debtToEquity", "beta",
+]
+# Always shown in screen results, next to the filtered and sorted fields
+RESULT_FIELDS = ["longName", "sector", "marketCap"]
+
+_FILTER = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|==|=|<|>|~)\s*(.+?)\s*$")
+_SCALE = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+class Condition:
+    """One parsed ``<field> <op> <value>`` screen filter."""
+
+    def __init__(self, text: str):
+        match = _FILTER.match(text or "")
+        if not match or match.group(1) not in TEXT_FIELDS + NUMERIC_FIELDS:
+            raise ValueError(f"Invalid filter '{text}'. Use '<field> <op> <value>' with one of the fields "
+                             f"{', '.join(TEXT_FIELDS + NUMERIC_FIELDS)}")
+        self.field, self.op, value = match.groups()
+        self.op = "==" if self.op == "=" else self.op
+        value = value.strip("'\"")
+        if self.field in TEXT_FIELDS:
+            if self.op not in ("==", "!=", "~"):
+                raise ValueError(f"Invalid filter '{text}'. Text fields support ==, != and ~ (contains)")
+            self.value = value.lower()
+        else:
+            if self.op == "~":
+                raise ValueError(f"Invalid filter '{text}'. Numeric fields support <, <=, >, >=, == and !=")
+            try:
+                scale = _SCALE.get(value[-1:].upper())
+                self.value = float(value[:-1]) * scale if scale else float(value)
+            except ValueError:
+                raise ValueError(f"Invalid filter '{text}'. '{value}' is not a number") from None
+
+    def mask(self, frame):
+        column = frame[self.field]
+        if self.field in TEXT_FIELDS:
+            column = column.str.lower()
+            if self.op == "~":
+                return column.str.contains(self.value, regex=False, na=False)
+        result = {"<": column.lt, "<=": column.le, ">": column.gt, ">=": column.ge,
+                  "==": column.eq, "!=": column.ne}[self.op](self.value)
+        # Missing values never match, not even !=
+        return result & column.notna()
+
+
+class Screener:
+    """Columnar in-memory snapshot of key ``info`` fields for a ticker universe.
+
+    The universe (``SCREENER_UNIVERSE`` or one ticker per line of ``universe_path``,
+    without indices, which have none of the screened fields) is fetched through the
+    tools' ``_fetch`` path on a pool of ``workers`` threads and held as one DataFrame,
+    so screens are answered with vectorized column operations instead of a tool call
+    per ticker. A background thread rebuilds the snapshot every
+    ``refresh_interval`` seconds; tickers that fail to refresh keep their previous row.
+    Without the thread, a stale snapshot is rebuilt by the next screen.
+    """
+
+    def __init__(self, universe: list[str] | None = None, refresh_interval: float = SCREENER_REFRESH_INTERVAL,
+                 workers: int = SCREENER_WORKERS):
+        if universe is None:
+            universe = [t for t in load_watchlist(SCREENER_UNIVERSE_PATH, SCREENER_UNIVERSE) if not is_index(t)]
+        self.universe = universe
+        self.refresh_interval = refresh_interval
+        self.workers = workers
+        self.updated_at = 0.0
+        self._frame = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _load(self, symbol: str):
+        from MarketInsight.utils import tools
+
+        try:
+            return tools._fetch(symbol, "info", refresh=True)
+        except Exception as e:
+            logger.debug("Failed to refresh screener data of %s: %s", symbol, e)
+            return None
+
+    def _rebuild(self) -> None:
+        import pandas as pd
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screener") as pool:
+            infos = dict(zip(self.universe, pool.map(self._load, self.universe)))
+
+        rows = {symbol: {field: info.get(field) for field in TEXT_FIELDS + NUMERIC_FIELDS}
+                for symbol, info in infos.items() if info}
+        frame = pd.DataFrame.from_dict(rows, orient="index", columns=TEXT_FIELDS + NUMERIC_FIELDS)
+        frame[NUMERIC_FIELDS] = frame[NUMERIC_FIELDS].apply(pd.to_numeric, errors="coerce").astype("float64")
+        failed = [symbol for symbol in self.universe if symbol not in rows]
+        if self._frame is not None and failed:
+            frame = pd.concat([frame, self._frame.loc[self._frame.index.intersection(failed)]])
+        frame[TEXT_FIELDS] = frame[TEXT_FIELDS].astype("category")
+        frame.index.name = "symbol"
+
+        self._frame, self.updated_at = frame, time.time()
+        logger.info("Built screener snapshot of %d tickers in %.3f seconds (%d failed)",
+                    len(frame), time.perf_counter() - started, len(failed))
+
+    def snapshot(self):
+        """The current snapshot, built (or rebuilt when stale and not refreshed in the background) on demand."""
+        if self._frame is None or (self._thread is None and time.time() - self.updated_at > self.refresh_interval):
+            with self._lock:
+                if self._frame is None or (self._thread is None and time.time() - self.updated_at > self.refresh_interval):
+                    self._rebuild()
+        return self._frame
+
+    def screen(self, filters: list[str] | None = None, sort_by: str | None = None, descending: bool = True,
+               limit: int = 10):
+        """Up to ``limit`` rows matching every filter, ordered by ``sort_by`` (missing values last), and the match count."""
+        conditions = [Condition(text) for text in filters or []]
+        if sort_by is not None and sort_by not in NUMERIC_FIELDS + TEXT_FIELDS:
+            raise ValueError(f"Invalid sort field '{sort_by}'. Use one of {', '.join(NUMERIC_FIELDS + TEXT_FIELDS)}")
+
+        frame = self.snapshot()
+        mask = None
+        for condition in conditions:
+            mask = condition.mask(frame) if mask is None else mask & condition.mask(frame)
+        matches = frame[mask] if mask is not None else frame
+        if sort_by is not None:
+            matches = matches.sort_values(sort_by, ascending=not descending, na_position="last")
+
+        columns = list(dict.fromkeys(RESULT_FIELDS + [c.field for c in conditions] + ([sort_by] if sort_by else [])))
+        return matches[columns].head(max(1, min(limit, SCREENER_MAX_RESULTS))), len(matches)
+
+    def _run(self) -> None:
+        while True:
+            if upstream.breaker.state != "open" or self._frame is None:
+                try:
+                    with self._lock:
+                        self._rebuild()
+                except Exception as e:
+                    logger.error("Screener refresh failed: %s", e)
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="screener-refresh", daemon=True)
+            self._thread.start()
+            logger.info("Refreshing screener snapshot of %d tickers every %.0fs", len(self.universe), self.refresh_interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"rows": 0 if self._frame is None else len(self._frame),
+                "age": time.time() - self.updated_at if self.updated_at else 0.0}
+
+
+screener = Screener()
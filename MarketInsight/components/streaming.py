@@ -0,0 +1,111 @@
+import json
+import math
+import time
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterator
+from config.config import STREAM_COALESCE_BYTES, STREAM_COALESCE_INTERVAL, STREAM_HEARTBEAT_INTERVAL
+
+# SSE comment line: ignored by EventSource clients, but keeps proxies from timing out an idle stream
+HEARTBEAT = ": keep-alive\n\n"
+
+
+class ToolEvent:
+    """A tool call starting (``tool_start``) or finishing (``tool_end``) during an agent run."""
+
+    def __init__(self, kind: str, name: str, call_id: str | None, status: str | None = None):
+        self.kind = kind
+        self.name = name
+        self.call_id = call_id
+        self.status = status
+
+    def data(self) -> dict:
+        data = {"name": self.name, "id": self.call_id}
+        if self.status:
+            data["status"] = self.status
+        return data
+
+
+def format_event(event_id: int, event: str, data: dict) -> str:
+    """One SSE event; the JSON payload escapes newlines, so it always fits a single ``data:`` line."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+async def sse_events(items: AsyncIterator, max_bytes: int = STREAM_COALESCE_BYTES,
+                     interval: float = STREAM_COALESCE_INTERVAL,
+                     heartbeat: float = STREAM_HEARTBEAT_INTERVAL) -> AsyncIterator[str]:
+    """Frame a stream of text tokens and ``ToolEvent``s as server-sent events with ids.
+
+    Tokens are buffered and sent as one ``token`` event once ``max_bytes`` are pending
+    or the oldest pending token is ``interval`` seconds old; the first token is sent
+    at once so time-to-first-token is unchanged. Tool events flush pending text and
+    go out immediately, a heartbeat comment is sent after ``heartbeat`` seconds
+    without output (e.g. during a long tool run), and the stream ends with a ``done``
+    event, or an ``error`` event before the failure is re-raised.
+    """
+    iterator = aiter(items)
+    pending: asyncio.Future | None = None
+    buffer: list[str] = []
+    size, deadline, event_id, sent_text = 0, None, 0, False
+    last_output = time.monotonic()
+
+    def frame(event: str, data: dict) -> str:
+        nonlocal event_id, last_output
+        event_id += 1
+        last_output = time.monotonic()
+        return format_event(event_id, event, data)
+
+    def flush() -> str:
+        nonlocal size, deadline, sent_text
+        text = "".join(buffer)
+        buffer.clear()
+        size, deadline, sent_text = 0, None, True
+        return frame("token", {"text": text})
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            wake = min(deadline if deadline is not None else math.inf, last_output + heartbeat)
+            # Wait without cancelling the pending read, so a slow token is never lost
+            done, _ = await asyncio.wait({pending}, timeout=max(0.0, wake - time.monotonic()))
+            if not done:
+                if deadline is not None and time.monotonic() >= deadline:
+                    yield flush()
+                elif time.monotonic() >= last_output + heartbeat:
+                    last_output = time.monotonic()
+                    yield HEARTBEAT
+                continue
+
+            read, pending = pending, None
+            try:
+                item = read.result()
+            except StopAsyncIteration:
+                break
+            if isinstance(item, ToolEvent):
+                if buffer:
+                    yield flush()
+                yield frame(item.kind, item.data())
+            elif item:
+                buffer.append(item)
+                size += len(item.encode())
+                if not sent_text or size >= max_bytes:
+                    yield flush()
+                elif deadline is None:
+                    deadline = time.monotonic() + interval
+
+        if buffer:
+            yield flush()
+        yield frame("done", {})
+    except Exception:
+        if buffer:
+            yield flush()
+        yield frame("error", {"message": "The response could not be completed. Please try again."})
+        raise
+    finally:
+        if pending is not None:
+            pending.cancel()
+            with suppress(asyncio.CancelledError, Exception):
+                await pending
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
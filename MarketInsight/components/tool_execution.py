@@ -0,0 +1,81 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from config.config import TOOL_MAX_CONCURRENCY, TOOL_CALL_TIMEOUT
+from MarketInsight.utils.metrics import TOOL_LATENCY, TOOL_ERRORS
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("ToolExecution")
+
+
+def _timeout_message(request, timeout: float) -> ToolMessage:
+    name = request.tool_call["name"]
+    logger.warning("Tool call %s timed out after %ss", name, timeout)
+    return ToolMessage(
+        content=f"Error: {name} did not respond within {timeout:.0f} seconds. Please try again later.",
+        tool_call_id=request.tool_call["id"],
+        name=name,
+        status="error",
+    )
+
+
+class ToolConcurrencyMiddleware(AgentMiddleware):
+    """Bounds and times out tool calls, which the agent's tool node runs concurrently.
+
+    When the model requests several tools in one step they are executed together
+    (as asyncio tasks on ``astream``, on a thread pool on ``stream``) and their
+    results keep the order of the calls. This middleware caps how many tool calls
+    run at once across all requests and turns a call exceeding ``timeout`` seconds
+    into an error result, so one slow upstream cannot stall the whole step.
+    """
+
+    def __init__(self, max_concurrency: int = TOOL_MAX_CONCURRENCY, timeout: float = TOOL_CALL_TIMEOUT):
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._thread_slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tool-call")
+
+    def wrap_tool_call(self, request, handler):
+        with self._thread_slots:
+            future = self._executor.submit(handler, request)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                return _timeout_message(request, self.timeout)
+
+    async def awrap_tool_call(self, request, handler):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._async_slots:
+            try:
+                return await asyncio.wait_for(handler(request), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                return _timeout_message(request, self.timeout)
+
+
+class ToolMetricsMiddleware(AgentMiddleware):
+    """Records latency and error counts of every tool call in the metrics registry."""
+
+    @staticmethod
+    def _record(request, result, started: float) -> None:
+        name = request.tool_call["name"]
+        TOOL_LATENCY.observe(time.perf_counter() - started, name)
+        if isinstance(result, ToolMessage) and (result.status == "error" or str(result.content).startswith("Error")):
+            TOOL_ERRORS.inc(name)
+
+    def wrap_tool_call(self, request, handler):
+        started = time.perf_counter()
+        result = handler(request)
+        self._record(request, result, started)
+        return result
+
+    async def awrap_tool_call(self, request, handler):
+        started = time.perf_counter()
+        result = await handler(request)
+        self._record(request, result, started)
+        return result
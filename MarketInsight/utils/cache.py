@@ -0,0 +1,129 @@
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+from config.config import CACHE_MAX_ENTRIES, CACHE_MAX_BYTES
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Cache")
+
+MISSING = object()
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Freshness of each yfinance dataset, in seconds
+DATASET_TTLS = {
+    "info": 15,
+    "history": 5 * MINUTE,
+    "news": 1 * HOUR,
+    "institutional_holders": 6 * HOUR,
+    "major_holders": 6 * HOUR,
+    "mutualfund_holders": 6 * HOUR,
+    "insider_transactions": 6 * HOUR,
+    "recommendations": 6 * HOUR,
+    "recommendations_summary": 6 * HOUR,
+    "balance_sheet": 1 * DAY,
+    "financials": 1 * DAY,
+    "cashflow": 1 * DAY,
+    "dividends": 1 * DAY,
+    "splits": 7 * DAY,
+}
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a cached value in bytes."""
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL.
+
+    Expired entries are not returned by ``get`` but stay in place until they are
+    overwritten or evicted, so they can still be served as stale data via ``get_stale``.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_stale(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            return MISSING if entry is None else entry[0]
+
+    def expires_in(self, key: Hashable) -> float | None:
+        """Seconds until ``key`` expires (negative once expired), or None if it is not cached."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[1] - time.monotonic()
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug("Not caching %s: %s bytes exceeds the cache size", key, size)
+            return
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Shared by every tool in MarketInsight.utils.tools, keyed by (symbol, dataset)
+market_cache = TTLCache()
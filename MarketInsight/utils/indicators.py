@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+DEFAULT_WINDOWS = (20, 50, 200)
+# Trailing return horizons in trading days
+RETURN_HORIZONS = {"1w": 5, "1m": 21, "3m": 63, "6m": 126, "1y": 252}
+
+
+def _last(series: pd.Series) -> float:
+    return float(series.iloc[-1]) if len(series) else float("nan")
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Wilder's relative strength index; 100 without losses, 50 for a flat window."""
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    value = 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+    value = value.mask((loss == 0) & (gain > 0), 100.0)
+    return value.mask((loss == 0) & (gain == 0), 50.0)
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple[pd.Series, pd.Series]:
+    line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    return line, line.ewm(span=signal, adjust=False).mean()
+
+
+def bollinger(close: pd.Series, window: int = 20, width: float = 2.0) -> tuple[pd.Series, pd.Series]:
+    middle = close.rolling(window).mean()
+    band = close.rolling(window).std() * width
+    return middle + band, middle - band
+
+
+def summarize(close: pd.Series, windows: tuple[int, ...] = DEFAULT_WINDOWS) -> dict:
+    """Latest value of every indicator for one daily close series.
+
+    Moving averages are computed for each of ``windows``; returns, volatility and
+    drawdowns are in percent, volatility annualized from daily log returns, and
+    drawdowns measured over the last year whatever the length of ``close``.
+    Indicators without enough history are NaN.
+    """
+    close = close.dropna()
+    if close.empty:
+        return {}
+    last = float(close.iloc[-1])
+    row = {"date": close.index[-1].strftime("%Y-%m-%d"), "close": last}
+
+    for window in windows:
+        row[f"sma_{window}"] = _last(close.rolling(window).mean())
+        row[f"ema_{window}"] = _last(close.ewm(span=window, adjust=False, min_periods=window).mean())
+
+    row["rsi_14"] = _last(rsi(close))
+    line, signal = macd(close)
+    row["macd"], row["macd_signal"] = _last(line), _last(signal)
+    row["macd_hist"] = row["macd"] - row["macd_signal"]
+    upper, lower = bollinger(close)
+    row["bb_upper"], row["bb_lower"] = _last(upper), _last(lower)
+    row["bb_pct_b"] = (last - row["bb_lower"]) / (row["bb_upper"] - row["bb_lower"]) \
+        if row["bb_upper"] != row["bb_lower"] else float("nan")
+
+    log_returns = np.log(close).diff()
+    for window in (20, 60):
+        row[f"vol_{window}d"] = _last(log_returns.rolling(window).std()) * np.sqrt(TRADING_DAYS) * 100
+
+    for label, days in RETURN_HORIZONS.items():
+        row[f"ret_{label}"] = (last / close.iloc[-days - 1] - 1) * 100 if len(close) > days else float("nan")
+    previous_year = close[close.index.year < close.index[-1].year]
+    row["ret_ytd"] = (last / previous_year.iloc[-1] - 1) * 100 if len(previous_year) else float("nan")
+
+    last_year = close.iloc[-TRADING_DAYS:]
+    drawdown = last_year / last_year.cummax() - 1
+    row["drawdown_1y"] = _last(drawdown) * 100
+    row["max_drawdown_1y"] = float(drawdown.min()) * 100
+    return row
@@ -1,44 +1,112 @@
 # logger.py
+import json
+import queue
+import atexit
 import logging
+import logging.handlers
 from datetime import datetime
 from pathlib import Path
+from config.config import (
+    LOG_DIR, LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_ASYNC, LOG_ROTATION, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN,
+)
 
-# Create log file ONCE
-_current_date = datetime.now().strftime("%Y-%m-%d")
-_current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-
-LOG_DIR = Path("logs") / _current_date
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-LOG_FILE = LOG_DIR / f"{_current_timestamp}.log"
+# Chatty third-party loggers kept at WARNING unless LOG_LEVELS says otherwise
+QUIET_LOGGERS = ("urllib3", "httpx", "httpcore", "openai", "yfinance", "peewee", "langfuse", "asyncio", "multipart")
 
 _LOGGING_CONFIGURED = False
+_LISTENER = None
 
 
-def get_logger(name: str = __name__) -> logging.Logger:
-    global _LOGGING_CONFIGURED
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "logger": record.name,
+            "level": record.levelname,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
 
-    if not _LOGGING_CONFIGURED:
+
+class _LazyDirectoryMixin:
+    """Creates the log directory when the first record is written, not at import."""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class LazyRotatingFileHandler(_LazyDirectoryMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class LazyTimedRotatingFileHandler(_LazyDirectoryMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the background listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _file_handler() -> logging.Handler:
+    now = datetime.now()
+    log_file = Path(LOG_DIR) / now.strftime("%Y-%m-%d") / f"{now.strftime('%Y-%m-%d_%H-%M-%S')}.log"
+    if LOG_ROTATION == "time":
+        return LazyTimedRotatingFileHandler(log_file, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT,
+                                            encoding="utf-8", delay=True)
+    return LazyRotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                   encoding="utf-8", delay=True)
+
+
+def _configure() -> None:
+    global _LOGGING_CONFIGURED, _LISTENER
+
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
         formatter = logging.Formatter(
             "[%(asctime)s]: %(name)s: %(levelname)s: %(lineno)d: %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
 
-        file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
+    file_handler = _file_handler()
+    file_handler.setFormatter(formatter)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.WARNING)
+    console_handler.setFormatter(formatter)
 
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.WARNING)
-        console_handler.setFormatter(formatter)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(LOG_LEVEL)
 
-        root_logger = logging.getLogger()
-        root_logger.setLevel(logging.DEBUG)
+    if LOG_ASYNC:
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(_DeferredQueueHandler(log_queue))
+        _LISTENER = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(_LISTENER.stop)
+    else:
         root_logger.addHandler(file_handler)
         root_logger.addHandler(console_handler)
 
-        _LOGGING_CONFIGURED = True
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _LOGGING_CONFIGURED = True
+
+
+def get_logger(name: str = __name__) -> logging.Logger:
+    if not _LOGGING_CONFIGURED:
+        _configure()
 
-    return logger
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,194 @@
+import bisect
+import weakref
+import threading
+from typing import Callable
+
+# Latency buckets in seconds, from cache hits to slow upstream calls and long agent runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RATE_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 500)
+
+
+def _escape(value) -> str:
+    """Escape a label value as the text exposition format requires; values can come from tool arguments."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _ShardOwner:
+    """Held only by a thread's local storage, so it is collected when the thread exits."""
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self):
+        self.shard = {}
+
+
+def _add(total: dict, shard: dict) -> None:
+    for labels, value in shard.items():
+        if isinstance(value, list):
+            state = total.setdefault(labels, [0] * len(value))
+            for i, item in enumerate(value):
+                state[i] += item
+        else:
+            total[labels] = total.get(labels, 0.0) + value
+
+
+class _Sharded:
+    """Per-thread storage so the hot path never takes a lock; shards are summed on scrape.
+
+    When a thread exits its shard is folded into ``_retired``, so short-lived pool
+    threads do not leave a growing list of shards behind.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            owner = _ShardOwner()
+            with self._lock:
+                self._shards.append(owner.shard)
+            weakref.finalize(owner, self._retire, owner.shard)
+            self._local.owner = owner
+        return owner.shard
+
+    def _retire(self, shard: dict) -> None:
+        with self._lock:
+            _add(self._retired, shard)
+            self._shards = [s for s in self._shards if s is not shard]
+
+    def _snapshots(self) -> list[dict]:
+        with self._lock:
+            shards = list(self._shards)
+            retired = {}
+            _add(retired, self._retired)
+        return [retired] + [shard.copy() for shard in shards]
+
+
+class Counter(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__()
+        self.name, self.help, self.labelnames = name, help, labelnames
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def collect(self) -> list[str]:
+        totals: dict[tuple, float] = {}
+        for shard in self._snapshots():
+            _add(totals, shard)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in sorted(totals.items())]
+        return lines
+
+
+class Histogram(_Sharded):
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__()
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # bucket counts (last one is +Inf), then sum
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> list[str]:
+        totals: dict[tuple, list] = {}
+        for shard in self._snapshots():
+            _add(totals, {labels: list(state) for labels, state in shard.items()})
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, state in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), state[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """A value that is set or adjusted directly, or read from ``function`` on scrape."""
+
+    def __init__(self, name: str, help: str, function: Callable[[], float] | None = None):
+        self.name, self.help, self.function = name, help, function
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self.function = function
+
+    def collect(self) -> list[str]:
+        try:
+            value = self.function() if self.function else self._value
+        except Exception:
+            value = float("nan")
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, function: Callable[[], float] | None = None) -> Gauge:
+        return self.register(Gauge(name, help, function))
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.collect()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+TOOL_LATENCY = registry.histogram("marketinsight_tool_latency_seconds", "Tool call latency", ("tool",))
+TOOL_ERRORS = registry.counter("marketinsight_tool_errors_total", "Tool calls that returned an error", ("tool",))
+TICKER_FETCH_SECONDS = registry.counter("marketinsight_ticker_fetch_seconds_total",
+                                        "Upstream fetch time spent per watchlist ticker (others pooled) and dataset",
+                                        ("ticker", "dataset"))
+PREFETCH_REFRESHES = registry.counter("marketinsight_prefetch_refreshes_total",
+                                      "Background cache refreshes per dataset and outcome", ("dataset", "status"))
+ADMISSION_REJECTED = registry.counter("marketinsight_admission_rejected_total", "Chat requests rejected by admission control",
+                                      ("reason",))
+ADMISSION_WAIT = registry.histogram("marketinsight_admission_wait_seconds", "Time chat requests spent queued for a slot")
+CHAT_CANCELLED = registry.counter("marketinsight_chat_cancelled_total", "Agent runs cancelled before completion", ("reason",))
+AGENT_TTFT = registry.histogram("marketinsight_agent_time_to_first_token_seconds", "Time from request to first streamed token")
+STREAM_DURATION = registry.histogram("marketinsight_stream_duration_seconds", "Total duration of chat streams")
+STREAM_TOKEN_RATE = registry.histogram("marketinsight_stream_tokens_per_second", "Tokens streamed per second after the first token",
+                                       buckets=RATE_BUCKETS)
+ACTIVE_STREAMS = registry.gauge("marketinsight_active_streams", "Chat streams currently open")
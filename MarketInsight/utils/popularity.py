@@ -0,0 +1,47 @@
+import math
+import time
+import threading
+from config.config import PREFETCH_HALF_LIFE
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Popularity")
+
+
+class Popularity:
+    """Exponentially decayed request counts per ticker.
+
+    Each ``record`` adds one to the ticker's score and scores halve every
+    ``half_life`` seconds, so ``top`` reflects what is being asked about now rather
+    than all-time totals. At most ``max_tracked`` tickers are kept; the coldest are
+    dropped first.
+    """
+
+    def __init__(self, half_life: float = PREFETCH_HALF_LIFE, max_tracked: int = 10_000):
+        self.decay = math.log(2) / half_life
+        self.max_tracked = max_tracked
+        self._scores: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _score(self, entry: tuple[float, float], now: float) -> float:
+        score, updated = entry
+        return score * math.exp(-self.decay * (now - updated))
+
+    def record(self, ticker: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._scores.get(ticker)
+            self._scores[ticker] = ((self._score(entry, now) if entry else 0.0) + 1.0, now)
+            if len(self._scores) > self.max_tracked:
+                coldest = sorted(self._scores, key=lambda t: self._score(self._scores[t], now))
+                for t in coldest[:len(self._scores) - self.max_tracked]:
+                    del self._scores[t]
+
+    def top(self, n: int, min_score: float = 0.0) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            scored = [(self._score(entry, now), ticker) for ticker, entry in self._scores.items()]
+        return [ticker for score, ticker in sorted(scored, reverse=True)[:n] if score >= min_score]
+
+
+# Fed by every tool fetch in MarketInsight.utils.tools
+popularity = Popularity()
@@ -0,0 +1,280 @@
+import os
+import re
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable
+import numpy as np
+import pandas as pd
+from config.config import PRICE_STORE_DIR, PRICE_STORE_MAX_SYMBOLS
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("PriceStore")
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the store is then only safe for one process
+    fcntl = None
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits")
+_ZERO_FILLED = ("Dividends", "Stock Splits")
+_EVENT_COLUMNS = [COLUMNS.index(name) for name in _ZERO_FILLED]
+# Symbols come from model tool calls and name directories, so only ticker characters are allowed
+_SYMBOL = re.compile(r"[A-Za-z0-9.^=_-]+")
+# Longest run of weekdays an exchange closes for (e.g. Lunar New Year), so an empty fetch is a holiday
+MAX_HOLIDAY_WEEKDAYS = 5
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def _event_dates(dates: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Days with a dividend or stock split."""
+    return np.unique(dates[(values[:, _EVENT_COLUMNS] != 0).any(axis=1)]) if len(dates) else dates
+
+
+def _to_arrays(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Convert a yfinance history frame into (dates, values) arrays in COLUMNS order."""
+    if frame is None or frame.empty:
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, len(COLUMNS)))
+
+    index = frame.index.tz_localize(None) if getattr(frame.index, "tz", None) is not None else frame.index
+    frame = frame.reindex(columns=list(COLUMNS))
+    frame[list(_ZERO_FILLED)] = frame[list(_ZERO_FILLED)].fillna(0.0)
+    return index.values.astype("datetime64[D]"), frame.to_numpy(dtype=np.float64)
+
+
+class SymbolSeries:
+    """Daily OHLCV columns for one symbol plus the date ranges already fetched.
+
+    ``coverage`` holds sorted, non-overlapping ``[start, end)`` day ranges that were
+    fetched successfully. ``events`` are the dividend and split days the stored
+    (adjusted) prices already account for.
+    """
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray, coverage: np.ndarray, version: int = 0,
+                 events: np.ndarray | None = None):
+        self.dates = dates
+        self.values = values
+        self.coverage = coverage
+        self.events = _event_dates(dates, values) if events is None else events
+        # mtime of the files this was read from, to notice saves by other processes
+        self.version = version
+        self.lock = threading.Lock()
+
+    def missing(self, start: np.datetime64, end: np.datetime64) -> list[tuple[np.datetime64, np.datetime64]]:
+        gaps, cursor = [], start
+        for covered_start, covered_end in self.coverage:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def adjustments_changed(self, dates: np.ndarray, values: np.ndarray) -> bool:
+        """Record the events in freshly fetched rows; True if one is new and postdates stored rows.
+
+        yfinance back-adjusts earlier prices for each dividend and split, so stored rows
+        older than a new event no longer line up with rows fetched after it.
+        """
+        new = np.setdiff1d(_event_dates(dates, values), self.events)
+        if not len(new):
+            return False
+        self.events = np.union1d(self.events, new)
+        return bool(len(self.dates)) and bool((new > self.dates[0]).any())
+
+    def reset(self) -> None:
+        """Drop the stored rows and coverage, keeping the known events, so every range is refetched."""
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.values = np.empty((0, len(COLUMNS)))
+        self.coverage = np.empty((0, 2), dtype="datetime64[D]")
+
+    def merge(self, dates: np.ndarray, values: np.ndarray, start: np.datetime64, end: np.datetime64,
+              covered: bool = True) -> None:
+        all_dates = np.concatenate([self.dates, dates])
+        all_values = np.concatenate([self.values, values])
+        # Stable sort keeps existing rows first, so freshly fetched rows win on duplicates
+        order = np.argsort(all_dates, kind="stable")
+        all_dates, all_values = all_dates[order], all_values[order]
+        keep = np.ones(len(all_dates), dtype=bool)
+        keep[:-1] = all_dates[1:] != all_dates[:-1]
+        self.dates, self.values = all_dates[keep], all_values[keep]
+        if not covered:
+            return
+
+        ranges = sorted([tuple(r) for r in self.coverage] + [(start, end)])
+        merged = [list(ranges[0])]
+        for range_start, range_end in ranges[1:]:
+            if range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        self.coverage = np.array(merged, dtype="datetime64[D]")
+
+    def slice(self, start: np.datetime64, end: np.datetime64) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = np.searchsorted(self.dates, [start, end], side="left")
+        return self.dates[lo:hi], self.values[lo:hi]
+
+
+class PriceStore:
+    """Incremental on-disk store of daily price history, one directory per symbol.
+
+    Arrays are saved as ``.npy`` files and memory-mapped on load, so only the pages a
+    query touches are read. Only date ranges that were never fetched go upstream;
+    days from today onwards are always fetched through ``fetch`` (which is expected
+    to be cached) and never persisted, since they can still change. Worker processes
+    share the directory: files are read and replaced under a per-symbol ``flock``,
+    and a symbol is re-read before fetching if another process saved it since.
+    """
+
+    def __init__(self, root: str = PRICE_STORE_DIR, max_symbols: int = PRICE_STORE_MAX_SYMBOLS):
+        self.root = Path(root)
+        self.max_symbols = max_symbols
+        self._series: OrderedDict[str, SymbolSeries] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str) -> Path:
+        if not _SYMBOL.fullmatch(symbol) or symbol in (".", ".."):
+            raise ValueError(f"Invalid ticker symbol '{symbol}'")
+        return self.root / symbol
+
+    @contextmanager
+    def _file_lock(self, symbol: str, exclusive: bool):
+        """Lock a symbol's files against other worker processes while they are read or replaced."""
+        path = self._path(symbol)
+        if fcntl is None or not (exclusive or path.exists()):
+            yield
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / ".lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _version(self, symbol: str) -> int:
+        try:
+            return (self._path(symbol) / "coverage.npy").stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _read(self, symbol: str) -> SymbolSeries:
+        path = self._path(symbol)
+        with self._file_lock(symbol, exclusive=False):
+            try:
+                # Stores written without events.npy may hold coverage of failed fetches; start over
+                return SymbolSeries(
+                    np.load(path / "dates.npy", mmap_mode="r"),
+                    np.load(path / "values.npy", mmap_mode="r"),
+                    np.load(path / "coverage.npy"),
+                    self._version(symbol),
+                    np.load(path / "events.npy"),
+                )
+            except FileNotFoundError:
+                return SymbolSeries(
+                    np.empty(0, dtype="datetime64[D]"),
+                    np.empty((0, len(COLUMNS))),
+                    np.empty((0, 2), dtype="datetime64[D]"),
+                )
+
+    def _load(self, symbol: str) -> SymbolSeries:
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is not None:
+                self._series.move_to_end(symbol)
+                return series
+
+            series = self._read(symbol)
+            self._series[symbol] = series
+            while len(self._series) > self.max_symbols:
+                self._series.popitem(last=False)
+            return series
+
+    def _reload_if_changed(self, symbol: str, series: SymbolSeries) -> None:
+        """Pick up ranges another worker process saved since ``series`` was read."""
+        if self._version(symbol) != series.version:
+            fresh = self._read(symbol)
+            series.dates, series.values, series.coverage, series.version, series.events = \
+                fresh.dates, fresh.values, fresh.coverage, fresh.version, fresh.events
+
+    def _save(self, symbol: str, series: SymbolSeries) -> None:
+        path = self._path(symbol)
+        path.mkdir(parents=True, exist_ok=True)
+        with self._file_lock(symbol, exclusive=True):
+            # coverage.npy is written last: its mtime is the version other processes compare
+            for name, array in (("dates", series.dates), ("values", series.values), ("events", series.events),
+                                ("coverage", series.coverage)):
+                tmp = path / f"{name}.tmp.npy"
+                np.save(tmp, np.ascontiguousarray(array))
+                os.replace(tmp, path / f"{name}.npy")
+            series.version = self._version(symbol)
+
+    def history(self, ticker: str, start_date: str, end_date: str,
+                fetch: Callable[[str, str], pd.DataFrame]) -> pd.DataFrame:
+        """Return daily history for ``[start_date, end_date)``, fetching only missing ranges.
+
+        ``fetch(start, end)`` must return a yfinance ``history`` frame for that range.
+        yfinance reports failures as empty frames, so an empty result is recorded as
+        covered only when the range has no weekdays, or spans no more weekdays than an
+        exchange holiday for a symbol that has stored rows. A dividend or split not seen
+        before drops the symbol's stored rows so they are refetched with the new
+        adjustment. Raises ``ValueError`` for a symbol that is not a valid ticker.
+        """
+        symbol = ticker.strip().upper()
+        start, end = _day(start_date), _day(end_date)
+        today = np.datetime64("today", "D")
+        closed_end = min(end, today)
+
+        series = self._load(symbol)
+        tail_dates, tail_values = np.empty(0, dtype="datetime64[D]"), np.empty((0, len(COLUMNS)))
+        if end > today:
+            tail_dates, tail_values = _to_arrays(fetch(str(max(start, today)), str(end)))
+
+        if start < closed_end:
+            with series.lock:
+                self._reload_if_changed(symbol, series)
+                changed = series.adjustments_changed(tail_dates, tail_values)
+                if changed:
+                    logger.info("New dividend or split for %s; refetching its stored history", symbol)
+                    series.reset()
+                try:
+                    # A second pass refetches the rows dropped by an event found in the first
+                    for _ in range(2):
+                        reset = False
+                        for gap_start, gap_end in series.missing(start, closed_end):
+                            logger.debug("Fetching %s history gap %s to %s", symbol, gap_start, gap_end)
+                            dates, values = _to_arrays(fetch(str(gap_start), str(gap_end)))
+                            changed = True
+                            if series.adjustments_changed(dates, values):
+                                logger.info("New dividend or split for %s; refetching its stored history", symbol)
+                                series.reset()
+                                reset = True
+                            weekdays = np.busday_count(gap_start, gap_end)
+                            covered = len(dates) > 0 or weekdays == 0 or (
+                                weekdays <= MAX_HOLIDAY_WEEKDAYS and len(series.dates) > 0)
+                            series.merge(dates, values, gap_start, gap_end, covered)
+                        if not reset:
+                            break
+                finally:
+                    # Keep the gaps fetched before a failure; symbols that never returned data are not persisted
+                    if changed and (len(series.dates) or len(series.events)):
+                        self._save(symbol, series)
+                dates, values = series.slice(start, closed_end)
+        else:
+            dates, values = np.empty(0, dtype="datetime64[D]"), np.empty((0, len(COLUMNS)))
+
+        if len(tail_dates):
+            dates, values = np.concatenate([dates, tail_dates]), np.concatenate([values, tail_values])
+
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="Date"), columns=list(COLUMNS))
+
+
+price_store = PriceStore()
@@ -0,0 +1,165 @@
+import json
+import threading
+import pandas as pd
+from config.config import TOOL_TOKEN_BUDGET
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Serializer")
+
+# Rough characters-per-token ratio of the OpenAI tokenizers for English/number-heavy text
+CHARS_PER_TOKEN = 4
+SIGNIFICANT_DIGITS = 6
+# Rows rendered to estimate the uncompacted size of a large DataFrame
+RAW_SIZE_SAMPLE_ROWS = 32
+
+_PRICE_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+                      "Dividends": "sum", "Stock Splits": "max"}
+_RESAMPLE_RULES = (("W", "weekly"), ("ME", "monthly"), ("QE", "quarterly"))
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class SerializationStats:
+    """Running totals of how much tool output the serializer has saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.raw_bytes = 0
+        self.compact_bytes = 0
+
+    def record(self, raw_bytes: int, compact_bytes: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.raw_bytes += raw_bytes
+            self.compact_bytes += compact_bytes
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "raw_bytes": self.raw_bytes,
+                "compact_bytes": self.compact_bytes,
+                "tokens_saved": max(self.raw_bytes - self.compact_bytes, 0) // CHARS_PER_TOKEN,
+            }
+
+
+serialization_stats = SerializationStats()
+
+
+# --------------------------------------------------------------------------------
+# Encoders
+# --------------------------------------------------------------------------------
+def _round(value):
+    if isinstance(value, float):
+        return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+    if isinstance(value, dict):
+        return {k: _round(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round(v) for v in value]
+    return value
+
+
+def _format_dates(index: pd.Index) -> pd.Index:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.strftime("%Y-%m-%d")
+    return index
+
+
+def _encode_frame(frame: pd.DataFrame) -> str:
+    """Compact CSV with dates as YYYY-MM-DD and floats to SIGNIFICANT_DIGITS."""
+    frame = frame.copy()
+    frame.index = _format_dates(frame.index)
+    frame.columns = _format_dates(frame.columns)
+    return frame.to_csv(float_format=f"%.{SIGNIFICANT_DIGITS}g", lineterminator="\n").strip()
+
+
+def _encode_json(value) -> str:
+    return json.dumps(_round(value), separators=(",", ":"), default=str)
+
+
+def _summarize_prices(frame: pd.DataFrame) -> str:
+    close = frame["Close"].dropna()
+    if close.empty:
+        return ""
+    change = (close.iloc[-1] / close.iloc[0] - 1) * 100 if close.iloc[0] else float("nan")
+    return (f"summary: {len(frame)} daily rows {close.index[0]:%Y-%m-%d} to {close.index[-1]:%Y-%m-%d}, "
+            f"close first={close.iloc[0]:.{SIGNIFICANT_DIGITS}g} last={close.iloc[-1]:.{SIGNIFICANT_DIGITS}g} "
+            f"min={close.min():.{SIGNIFICANT_DIGITS}g} max={close.max():.{SIGNIFICANT_DIGITS}g} change={change:.2f}%")
+
+
+def _downsample(frame: pd.DataFrame, budget: int) -> str:
+    """Resample a long daily series to coarser periods until it fits ``budget`` tokens."""
+    summary = _summarize_prices(frame) if "Close" in frame.columns else ""
+    aggregation = {c: _PRICE_AGGREGATION.get(c, "last") for c in frame.columns}
+
+    text = ""
+    for rule, label in _RESAMPLE_RULES:
+        resampled = frame.resample(rule).agg(aggregation).dropna(how="all")
+        text = "\n".join(filter(None, [summary, f"{label} rows:", _encode_frame(resampled)]))
+        if estimate_tokens(text) <= budget:
+            break
+    return text
+
+
+def _raw_frame_size(frame: pd.DataFrame) -> int:
+    """Size of ``str(frame.to_dict())``, extrapolated from a sample of rows for large frames."""
+    if len(frame) <= RAW_SIZE_SAMPLE_ROWS:
+        return len(str(frame.to_dict()))
+    sample = frame.iloc[:RAW_SIZE_SAMPLE_ROWS]
+    return len(str(sample.to_dict())) * len(frame) // RAW_SIZE_SAMPLE_ROWS
+
+
+def _truncate(text: str, budget: int) -> str:
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    lines, kept, size = text.split("\n"), [], 0
+    for line in lines:
+        if size + len(line) + 1 > limit:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    if not kept:
+        return text[:limit] + "...[truncated]"
+    return "\n".join(kept) + f"\n...[{len(lines) - len(kept)} more rows truncated]"
+
+
+# --------------------------------------------------------------------------------
+# Entry point used by the tools
+# --------------------------------------------------------------------------------
+def serialize(value, budget: int | None = None, fields: list[str] | None = None, name: str = "tool") -> str:
+    """Encode a tool result for the LLM within ``budget`` tokens.
+
+    DataFrames and Series become compact CSV, long daily series are downsampled to
+    weekly (or coarser) rows plus a summary line, dicts and lists become compact JSON.
+    ``fields`` projects DataFrame columns or dict keys before encoding.
+    """
+    budget = budget or TOOL_TOKEN_BUDGET
+
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+
+    if isinstance(value, pd.DataFrame):
+        raw_size = _raw_frame_size(value)
+        frame = value[[c for c in value.columns if c in fields]] if fields else value
+        text = _encode_frame(frame)
+        if estimate_tokens(text) > budget and isinstance(frame.index, pd.DatetimeIndex) and len(frame) > 1:
+            text = _downsample(frame, budget)
+    elif isinstance(value, dict):
+        raw_size = len(str(value))
+        text = _encode_json({k: v for k, v in value.items() if k in fields} if fields else value)
+    elif isinstance(value, (list, tuple)):
+        raw_size = len(str(value))
+        text = _encode_json([{k: v for k, v in item.items() if k in fields} if fields and isinstance(item, dict)
+                             else item for item in value])
+    else:
+        return str(value)
+
+    text = _truncate(text, budget)
+    serialization_stats.record(raw_size, len(text))
+    logger.debug("Serialized %s: %s -> %s bytes, ~%s tokens saved",
+                 name, raw_size, len(text), max(raw_size - len(text), 0) // CHARS_PER_TOKEN)
+    return text
@@ -0,0 +1,183 @@
+import os
+import time
+import zlib
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Hashable
+from config.config import SHARED_CACHE_PATH, SHARED_CACHE_MAX_BYTES, SHARED_CACHE_STALE_TTL, SHARED_CACHE_LEASE_TIMEOUT
+from MarketInsight.utils.cache import MISSING
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("SharedCache")
+
+# Expired rows and size limits are enforced once every this many writes
+PRUNE_EVERY = 256
+
+
+def _key(key: Hashable) -> str:
+    return "\x1f".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+def encode(value: Any) -> bytes:
+    """Pickle (DataFrames keep their numpy blocks as raw bytes) and compress a value."""
+    return zlib.compress(pickle.dumps(value, protocol=5), 1)
+
+
+def decode(blob: bytes) -> Any:
+    return pickle.loads(zlib.decompress(blob))
+
+
+class SharedCache:
+    """Market data cache shared by every worker process on the host.
+
+    Entries live in a SQLite database in WAL mode, so readers in any process do not
+    block the writer. Each row stores its absolute expiry time and is replaced in a
+    single statement, so a reader sees either the old or the new value. Expired rows
+    are kept for ``stale_ttl`` seconds to be served when upstream fails. A lease row
+    lets one process fetch a missing key while the others wait for its result
+    instead of calling upstream themselves. Database errors are logged and treated
+    as misses; an empty ``path`` disables the tier.
+    """
+
+    def __init__(self, path: str = SHARED_CACHE_PATH, max_bytes: int = SHARED_CACHE_MAX_BYTES,
+                 stale_ttl: float = SHARED_CACHE_STALE_TTL, lease_timeout: float = SHARED_CACHE_LEASE_TIMEOUT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self.lease_timeout = lease_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or getattr(self._local, "pid", None) != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                       "size INTEGER NOT NULL, expires_at REAL NOT NULL, updated_at REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner INTEGER NOT NULL, expires_at REAL NOT NULL)")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: Hashable, min_ttl: float = 0.0) -> tuple[Any, float] | object:
+        """``(value, seconds left)`` if ``key`` is fresh for more than ``min_ttl`` seconds, else MISSING."""
+        if not self.enabled:
+            return MISSING
+        try:
+            row = self._connection().execute("SELECT value, expires_at FROM entries WHERE key = ? AND expires_at > ?",
+                                             (_key(key), time.time() + min_ttl)).fetchone()
+            result = MISSING if row is None else (decode(row[0]), row[1] - time.time())
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error) as e:
+            logger.warning("Shared cache read of %s failed: %s", key, e)
+            result = MISSING
+        self._count(result is not MISSING)
+        return result
+
+    def get_stale(self, key: Hashable) -> Any:
+        if not self.enabled:
+            return MISSING
+        try:
+            row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (_key(key),)).fetchone()
+            return MISSING if row is None else decode(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error) as e:
+            logger.warning("Shared cache read of %s failed: %s", key, e)
+            return MISSING
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if not self.enabled:
+            return
+        try:
+            blob = encode(value)
+            if len(blob) > self.max_bytes:
+                return
+            now = time.time()
+            db = self._connection()
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (_key(key), blob, len(blob), now + ttl, now))
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % PRUNE_EVERY == 0
+            if prune:
+                self._prune(db, now)
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            logger.warning("Shared cache write of %s failed: %s", key, e)
+
+    def _prune(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE expires_at < ?", (now - self.stale_ttl,))
+        db.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+        # Least recently written rows beyond the size limit
+        db.execute("DELETE FROM entries WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                   "(ORDER BY updated_at DESC) AS total FROM entries) WHERE total > ?)", (self.max_bytes,))
+
+    # ----- Cross-process fetch leases -----
+    def acquire(self, key: Hashable) -> bool:
+        """Take the fetch lease for ``key``; False while another process holds an unexpired one."""
+        if not self.enabled:
+            return True
+        now = time.time()
+        try:
+            cursor = self._connection().execute(
+                "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, "
+                "expires_at = excluded.expires_at WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+                (_key(key), os.getpid(), now + self.lease_timeout, now))
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.warning("Shared cache lease of %s failed: %s", key, e)
+            return True
+
+    def release(self, key: Hashable) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (_key(key), os.getpid()))
+        except sqlite3.Error as e:
+            logger.warning("Shared cache lease release of %s failed: %s", key, e)
+
+    def wait(self, key: Hashable, min_ttl: float = 0.0, poll: float = 0.05) -> tuple[Any, float] | object:
+        """Wait for the lease holder's value; MISSING if the lease is released or expires without one."""
+        deadline = time.monotonic() + self.lease_timeout
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            result = self.get(key, min_ttl)
+            if result is not MISSING:
+                return result
+            try:
+                held = self._connection().execute("SELECT 1 FROM leases WHERE key = ? AND expires_at > ?",
+                                                  (_key(key), time.time())).fetchone()
+            except sqlite3.Error:
+                held = None
+            if held is None:
+                break
+        return MISSING
+
+    def clear(self) -> None:
+        if self.enabled:
+            db = self._connection()
+            db.execute("DELETE FROM entries")
+            db.execute("DELETE FROM leases")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+# Second tier behind market_cache, shared with the other uvicorn workers
+shared_cache = SharedCache()
@@ -0,0 +1,86 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+from config.config import SINGLEFLIGHT_ERROR_TTL
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("SingleFlight")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for and share its result. A failure is also shared with every caller
+    for ``error_ttl`` seconds, so a throttled upstream is not hit by a retry storm.
+    Thread-pool callers use ``do`` and asyncio callers use ``ado``.
+    """
+
+    def __init__(self, error_ttl: float = SINGLEFLIGHT_ERROR_TTL):
+        self.error_ttl = error_ttl
+        self._calls: dict[Hashable, Future] = {}
+        # Oldest first; every entry gets the same TTL, so this is also expiry order
+        self._failures: OrderedDict[Hashable, tuple[BaseException, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None:
+                if failure[1] > time.monotonic():
+                    future = Future()
+                    future.set_exception(failure[0])
+                    return future, False
+                del self._failures[key]
+
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                now = time.monotonic()
+                # Keys (e.g. history date ranges) may never be asked for again, so drop expired entries here
+                while self._failures and next(iter(self._failures.values()))[1] <= now:
+                    self._failures.popitem(last=False)
+                self._failures.pop(key, None)
+                self._failures[key] = (e, now + self.error_ttl)
+                del self._calls[key]
+            future.set_exception(e)
+        else:
+            with self._lock:
+                del self._calls[key]
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        else:
+            logger.debug("Joining in-flight call for %s", key)
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Async variant of ``do``; a blocking ``fn`` is run on the default executor."""
+        future, leader = self._join(key)
+        if leader:
+            await asyncio.get_running_loop().run_in_executor(None, self._run, key, future, fn)
+        else:
+            logger.debug("Joining in-flight call for %s", key)
+        return await asyncio.wrap_future(future)
+
+
+# Shared by every upstream fetch in MarketInsight.utils.tools
+inflight = SingleFlight()
@@ -0,0 +1,43 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Startup")
+
+
+class StartupReport:
+    """Wall time of each startup phase and the packages it had to import.
+
+    Phases wrap the expensive steps of bringing the service up (web framework,
+    application modules, chat model, tools, agent graph), so slow cold starts can
+    be traced to the imports that caused them. ``python -m benchmarks.startup``
+    gives the per-package breakdown.
+    """
+
+    def __init__(self):
+        self.phases: list[dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        before = set(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            loaded = set(sys.modules) - before
+            packages = sorted({module.split(".")[0] for module in loaded})
+            with self._lock:
+                self.phases.append({"phase": name, "seconds": elapsed, "modules": len(loaded), "packages": packages})
+            logger.info("Startup phase %s took %.3fs and imported %d modules (%s)",
+                        name, elapsed, len(loaded), ", ".join(packages[:8]) + (", ..." if len(packages) > 8 else ""))
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {phase["phase"]: round(phase["seconds"], 3) for phase in self.phases}
+
+
+startup = StartupReport()
@@ -0,0 +1,173 @@
+import re
+import csv
+import time
+import bisect
+import difflib
+import threading
+from pathlib import Path
+from collections import defaultdict
+from config.config import SYMBOL_LISTING_PATH, SYMBOL_INDEX_REFRESH
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Symbols")
+
+# Fuzzy matches only correct typos: the whole name and every word must be this similar
+# (difflib ratio); anything looser is left to the remote search
+FUZZY_THRESHOLD = 0.85
+FUZZY_WORD_THRESHOLD = 0.75
+# Trigram Jaccard similarity a name needs to be considered as a fuzzy candidate at all
+FUZZY_CANDIDATE_THRESHOLD = 0.3
+FUZZY_CANDIDATES = 5
+# Prefix matches need at least this many characters to avoid resolving "a" to anything
+MIN_PREFIX_LENGTH = 3
+
+_SUFFIXES = {"inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "plc",
+             "holding", "holdings", "group", "the", "nv", "sa", "ag", "class", "a", "b", "c"}
+
+
+def normalize(name: str) -> str:
+    """Lower-case a company name and drop punctuation and corporate suffixes."""
+    text = name.lower().replace("&", " and ")
+    words = re.sub(r"[^a-z0-9^.\- ]+", " ", text).replace(".", " ").replace("-", " ").split()
+    while len(words) > 1 and words[-1] in _SUFFIXES:
+        words.pop()
+    if len(words) > 1 and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolIndex:
+    """In-process company name to ticker index with exact, prefix and trigram lookup.
+
+    Built lazily from a CSV listing (``symbol,name,aliases`` with ``|``-separated
+    aliases) and rebuilt when the file changes on disk, checked at most every
+    ``refresh_interval`` seconds. Names learned at runtime via ``add`` survive rebuilds.
+    """
+
+    def __init__(self, path: str = SYMBOL_LISTING_PATH, refresh_interval: float = SYMBOL_INDEX_REFRESH):
+        self.path = Path(path)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._learned: dict[str, str] = {}
+        self._exact: dict[str, str] = {}
+        self._sorted_names: list[str] = []
+        self._trigram_postings: dict[str, set[str]] = defaultdict(set)
+        self._trigram_counts: dict[str, int] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _read_listing(self) -> list[tuple[str, list[str]]]:
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return [(row["symbol"].strip().upper(), [row["name"], *filter(None, (row.get("aliases") or "").split("|"))])
+                    for row in csv.DictReader(f) if row.get("symbol")]
+
+    def _rebuild(self) -> None:
+        entries = self._read_listing() if self.path.exists() else []
+        exact: dict[str, str] = {}
+        for symbol, names in entries:
+            for key in (symbol.lower(), *map(normalize, names)):
+                exact.setdefault(key, symbol)
+        exact.update(self._learned)
+
+        postings, counts = defaultdict(set), {}
+        for name in exact:
+            grams = _trigrams(name)
+            counts[name] = len(grams)
+            for gram in grams:
+                postings[gram].add(name)
+
+        self._exact, self._trigram_postings, self._trigram_counts = exact, postings, counts
+        self._sorted_names = sorted(exact)
+        logger.info("Built symbol index with %s listings and %s names", len(entries), len(exact))
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._mtime is not None and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            mtime = self.path.stat().st_mtime if self.path.exists() else 0.0
+            if mtime != self._mtime:
+                self._rebuild()
+                self._mtime = mtime
+
+    def _prefix(self, key: str) -> str | None:
+        """Ticker of the names starting with the whole words of ``key``, if they all agree.
+
+        Only queries of at least two words are matched: a single word that is not a
+        full name or alias ("general", "united", "home") is too generic to pin one
+        company, so it is left to the remote search.
+        """
+        if len(key) < MIN_PREFIX_LENGTH or len(key.split()) < 2:
+            return None
+        names = self._sorted_names
+        start = bisect.bisect_left(names, key + " ")
+        symbols = set()
+        for name in names[start:start + 50]:
+            if not name.startswith(key + " "):
+                break
+            symbols.add(self._exact[name])
+        # "adani" names several companies; let the remote search decide
+        return symbols.pop() if len(symbols) == 1 else None
+
+    def _fuzzy(self, key: str) -> str | None:
+        """Ticker of a name that differs from ``key`` only by typos, word for word."""
+        grams = _trigrams(key)
+        overlap: dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for name in self._trigram_postings.get(gram, ()):
+                overlap[name] += 1
+        candidates = sorted(((shared / (len(grams) + self._trigram_counts[name] - shared), name)
+                             for name, shared in overlap.items()), reverse=True)[:FUZZY_CANDIDATES]
+
+        words = key.split()
+        best, best_score = None, 0.0
+        for similarity, name in candidates:
+            if similarity < FUZZY_CANDIDATE_THRESHOLD:
+                break
+            # Every word must be matched, so "general mills" never becomes "general motors"
+            name_words = name.split()
+            if len(name_words) != len(words) or any(
+                    difflib.SequenceMatcher(None, word, name_word).ratio() < FUZZY_WORD_THRESHOLD
+                    for word, name_word in zip(words, name_words)):
+                continue
+            # A single word inside a longer one ("morgan" in "jpmorgan") is another name, not a typo
+            if len(words) == 1 and key != name and key in name:
+                continue
+            score = difflib.SequenceMatcher(None, key, name).ratio()
+            if score > best_score:
+                best, best_score = name, score
+        return self._exact[best] if best is not None and best_score >= FUZZY_THRESHOLD else None
+
+    def resolve(self, query: str) -> str | None:
+        """Return the ticker for a company name, alias or symbol, or None on a miss."""
+        self._ensure_fresh()
+        key = normalize(query)
+        if not key:
+            return None
+        return self._exact.get(query.strip().lower()) or self._exact.get(key) or self._prefix(key) or self._fuzzy(key)
+
+    def add(self, name: str, symbol: str) -> None:
+        """Memoize a name resolved elsewhere (e.g. by the remote search) into the index."""
+        key, symbol = normalize(name), symbol.strip().upper()
+        if not key:
+            return
+        with self._lock:
+            self._learned[key] = symbol
+            if key not in self._exact:
+                bisect.insort(self._sorted_names, key)
+                grams = _trigrams(key)
+                self._trigram_counts[key] = len(grams)
+                for gram in grams:
+                    self._trigram_postings[gram].add(key)
+            self._exact[key] = symbol
+
+
+symbol_index = SymbolIndex()
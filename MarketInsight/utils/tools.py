@@ -1,18 +1,149 @@
 import time
-import requests
+import pandas as pd
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from langchain.tools import tool
+from config.config import BATCH_MAX_TICKERS, BATCH_MAX_WORKERS
+from MarketInsight.utils.cache import market_cache, DATASET_TTLS, MISSING
+from MarketInsight.utils.shared_cache import shared_cache
+from MarketInsight.utils.singleflight import inflight
+from MarketInsight.utils.price_store import price_store
+from MarketInsight.utils.popularity import popularity
+from MarketInsight.utils.serializer import serialize
+from MarketInsight.utils.indicators import DEFAULT_WINDOWS, summarize
+from MarketInsight.utils.symbols import symbol_index
+from MarketInsight.utils.upstream import upstream
+from MarketInsight.utils.metrics import TICKER_FETCH_SECONDS
+from MarketInsight.components.prefetch import load_watchlist
 from MarketInsight.utils.logger import get_logger
 
 logger = get_logger("Tools")
 
+# Subset of the 150+ yfinance info fields returned by get_company_info unless others are requested
+COMPANY_INFO_FIELDS = [
+    "symbol", "longName", "sector", "industry", "country", "website", "fullTimeEmployees", "currency",
+    "marketCap", "enterpriseValue", "currentPrice", "previousClose", "fiftyTwoWeekLow", "fiftyTwoWeekHigh",
+    "trailingPE", "forwardPE", "pegRatio", "priceToBook", "priceToSalesTrailing12Months", "enterpriseToEbitda",
+    "trailingEps", "forwardEps", "dividendYield", "payoutRatio", "beta", "profitMargins", "operatingMargins",
+    "grossMargins", "returnOnEquity", "returnOnAssets", "revenueGrowth", "earningsGrowth", "totalRevenue",
+    "totalCash", "totalDebt", "debtToEquity", "currentRatio", "freeCashflow", "recommendationKey",
+    "targetMeanPrice", "numberOfAnalystOpinions",
+]
+
+# Tickers with their own fetch-time metric series; the rest share "other" to bound the label set
+METRIC_TICKERS = frozenset(load_watchlist())
+
+
+# --------------------------------------------------------------------------------
+# Shared fetch path: every tool reads yfinance data through the market cache
+# --------------------------------------------------------------------------------
+def _fetch(ticker: str, dataset: str, loader=None, params: tuple = (), refresh: bool = False):
+    """Return ``dataset`` for ``ticker``, from the cache when it is still fresh.
+
+    ``loader`` receives the ``yf.Ticker`` and defaults to reading the attribute named
+    ``dataset``; ``params`` distinguishes variants of a dataset such as date ranges.
+    Misses are looked up in the shared cache of the other worker processes first;
+    concurrent misses for the same key share a single upstream request, within this
+    process and across workers, and when upstream fails (or its circuit is open) an
+    expired cached value is served instead. ``refresh`` skips the in-process cache
+    lookup and is used by the background prefetcher, whose fetches do not count
+    towards a ticker's popularity.
+    """
+    key = (ticker.strip().upper(), dataset, *params)
+    ttl = DATASET_TTLS[dataset]
+    if not refresh:
+        popularity.record(key[0])
+        value = market_cache.get(key)
+        if value is not MISSING:
+            logger.debug("Cache hit for %s", key)
+            return value
+
+    def request():
+        stock = yf.Ticker(ticker)
+        return loader(stock) if loader else getattr(stock, dataset)
+
+    def load():
+        # A refresh only takes a shared value that is not itself about to expire
+        min_ttl = ttl / 2 if refresh else 0.0
+        shared = shared_cache.get(key, min_ttl)
+        if shared is MISSING and not shared_cache.acquire(key):
+            shared = shared_cache.wait(key, min_ttl)
+        if shared is not MISSING:
+            value, remaining = shared
+            market_cache.set(key, value, remaining)
+            return value
+
+        try:
+            started = time.perf_counter()
+            value = upstream.call(request, name=f"{dataset} of {key[0]}")
+            TICKER_FETCH_SECONDS.inc(key[0] if key[0] in METRIC_TICKERS else "other", dataset,
+                                     amount=time.perf_counter() - started)
+            market_cache.set(key, value, ttl)
+            shared_cache.set(key, value, ttl)
+        finally:
+            shared_cache.release(key)
+        return value
+
+    try:
+        return inflight.do(key, load)
+    except Exception as e:
+        stale = market_cache.get_stale(key)
+        if stale is MISSING:
+            stale = shared_cache.get_stale(key)
+        if stale is MISSING or refresh:
+            raise
+        logger.warning("Serving stale %s after upstream failure: %s", key, e)
+        return stale
+
+
+def _history(ticker: str, start_date: str, end_date: str):
+    """Daily history served from the on-disk price store, fetching only missing ranges."""
+    def fetch(start: str, end: str):
+        return _fetch(ticker, "history", lambda stock: stock.history(start=start, end=end), params=(start, end))
+
+    return price_store.history(ticker, start_date, end_date, fetch)
+
+
+def _normalize_tickers(tickers: list[str]) -> list[str]:
+    """Upper-case, de-duplicate (keeping order) and cap a list of ticker symbols."""
+    if isinstance(tickers, str):
+        tickers = tickers.split(",")
+    symbols = dict.fromkeys(t.strip().upper() for t in tickers if isinstance(t, str) and t.strip())
+    return list(symbols)[:BATCH_MAX_TICKERS]
+
+
+def _fetch_many(symbols: list[str], fn) -> dict:
+    """Run ``fn(symbol)`` for every symbol on a bounded pool; failures map to the exception."""
+    def safe(symbol):
+        try:
+            return fn(symbol)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(symbols), BATCH_MAX_WORKERS))) as executor:
+        return dict(zip(symbols, executor.map(safe, symbols)))
+
+
+def _news_item(item: dict) -> dict:
+    """Flatten a yfinance news entry (old flat or new nested 'content' layout) to the useful fields."""
+    content = item.get("content") or item
+    provider = content.get("provider") or {}
+    link = content.get("canonicalUrl") or {}
+    return {
+        "title": content.get("title"),
+        "publisher": provider.get("displayName") if isinstance(provider, dict) else content.get("publisher"),
+        "published": content.get("pubDate") or content.get("providerPublishTime"),
+        "summary": content.get("summary"),
+        "link": link.get("url") if isinstance(link, dict) else content.get("link"),
+    }
+
 
 # --------------------------------------------------------------------------------
 # Tool 1: Retrieve Company Stock Price
 # --------------------------------------------------------------------------------
 @tool('get_stock_price', description="A function that returns the current stock price of a given ticker")
 def get_stock_price(ticker: str):
-    logger.info(f"Retrieving Stock Price of {ticker}")
+    logger.info("Retrieving Stock Price of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
@@ -20,18 +151,17 @@ def get_stock_price(ticker: str):
     start_time = time.time()
 
     try:
-        stock = yf.Ticker(ticker)
-        stock_price = stock.info['regularMarketPrice']
+        stock_price = _fetch(ticker, "info").get('regularMarketPrice')
         end_time = time.time()
 
         if stock_price is None:
             return "No price data available for {ticker}"
         
-        logger.info(f"Retrieved Stock Price of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Stock Price of %s in %.3f seconds", ticker, end_time - start_time)
         return stock_price
 
     except Exception as e:
-        logger.error(f"Failed to retrieve stock price of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve stock price of %s: %s", ticker, e)
         return "Error: Failed to retrieve stock price. Please try again later."
 
 
@@ -40,25 +170,24 @@ def get_stock_price(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_historical_data', description="A function that returns the historical data of a given ticker in the given start and end date")
 def get_historical_data(ticker: str, start_date: str, end_date: str):
-    logger.info(f"Retrieving Historical Data of {ticker}")
+    logger.info("Retrieving Historical Data of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        historical_data = stock.history(start=start_date, end=end_date).to_dict()
+        historical_data = serialize(_history(ticker, start_date, end_date), name="history")
 
         if historical_data is None:
             return "No historical data available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Historical Data of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Historical Data of %s in %.3f seconds", ticker, end_time - start_time)
         return historical_data
 
     except Exception as e:
-        logger.error(f"Failed to retrieve historical data of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve historical data of %s: %s", ticker, e)
         return "Error: Failed to retrieve historical data. Please try again later."
 
 
@@ -67,25 +196,24 @@ def get_historical_data(ticker: str, start_date: str, end_date: str):
 # --------------------------------------------------------------------------------
 @tool('get_stock_news', description="A function that returns the news of a given ticker")
 def get_stock_news(ticker: str):
-    logger.info(f"Retrieving News of {ticker}")
+    logger.info("Retrieving News of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        news = stock.news
+        news = serialize([_news_item(item) for item in _fetch(ticker, "news") or []], name="news")
 
         if news is None:
             return "No news available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved News of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved News of %s in %.3f seconds", ticker, end_time - start_time)
         return news
 
     except Exception as e:
-        logger.error(f"Failed to retrieve news of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve news of %s: %s", ticker, e)
         return "Error: Failed to retrieve news. Please try again later."
 
 
@@ -94,25 +222,24 @@ def get_stock_news(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_balance_sheet', description="A function that returns the balance sheet of a given ticker")
 def get_balance_sheet(ticker: str):
-    logger.info(f"Retrieving Balance Sheet of {ticker}")
+    logger.info("Retrieving Balance Sheet of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        balance_sheet = stock.balance_sheet.to_dict()
+        balance_sheet = serialize(_fetch(ticker, "balance_sheet"), name="balance_sheet")
 
         if balance_sheet is None:
             return "No balance sheet available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Balance Sheet of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Balance Sheet of %s in %.3f seconds", ticker, end_time - start_time)
         return balance_sheet
 
     except Exception as e:
-        logger.error(f"Failed to retrieve balance sheet of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve balance sheet of %s: %s", ticker, e)
         return "Error: Failed to retrieve balance sheet. Please try again later."
 
 
@@ -121,25 +248,24 @@ def get_balance_sheet(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_income_statement', description="A function that returns the income statement of a given ticker")
 def get_income_statement(ticker: str):
-    logger.info(f"Retrieving Income Statement of {ticker}")
+    logger.info("Retrieving Income Statement of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        income_statement = stock.financials.to_dict()
+        income_statement = serialize(_fetch(ticker, "financials"), name="financials")
 
         if income_statement is None:
             return "No income statement available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Income Statement of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Income Statement of %s in %.3f seconds", ticker, end_time - start_time)
         return income_statement
 
     except Exception as e:
-        logger.error(f"Failed to retrieve income statement of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve income statement of %s: %s", ticker, e)
         return "Error: Failed to retrieve income statement. Please try again later."
     
 
@@ -148,51 +274,49 @@ def get_income_statement(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_cash_flow', description="A function that returns the cash flow statement of a given ticker")
 def get_cash_flow(ticker: str):
-    logger.info(f"Retrieving Cash Flow of {ticker}")
+    logger.info("Retrieving Cash Flow of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        cash_flow = stock.cashflow.to_dict()
+        cash_flow = serialize(_fetch(ticker, "cashflow"), name="cashflow")
 
         if cash_flow is None:
             return "No cash flow available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Cash Flow of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Cash Flow of %s in %.3f seconds", ticker, end_time - start_time)
         return cash_flow
 
     except Exception as e:
-        logger.error(f"Failed to retrieve cash flow of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve cash flow of %s: %s", ticker, e)
         return "Error: Failed to retrieve cash flow. Please try again later."
 
 # --------------------------------------------------------------------------------
 # Tool 7: Retrieve Company Info & Ratios
 # --------------------------------------------------------------------------------
-@tool('get_company_info', description="A function that returns company profile and key financial ratios")
-def get_company_info(ticker: str):
-    logger.info(f"Retrieving Company Info of {ticker}")
+@tool('get_company_info', description="A function that returns company profile and key financial ratios. Optionally pass the list of yfinance info fields to return")
+def get_company_info(ticker: str, fields: list[str] | None = None):
+    logger.info("Retrieving Company Info of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = serialize(_fetch(ticker, "info"), fields=fields or COMPANY_INFO_FIELDS, name="info")
 
         if info is None:
             return "No company info available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Company Info of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Company Info of %s in %.3f seconds", ticker, end_time - start_time)
         return info
 
     except Exception as e:
-        logger.error(f"Failed to retrieve company info of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve company info of %s: %s", ticker, e)
         return "Error: Failed to retrieve company info. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -200,25 +324,24 @@ def get_company_info(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_dividends', description="A function that returns the dividend payment history of a given ticker")
 def get_dividends(ticker: str):
-    logger.info(f"Retrieving Dividends of {ticker}")
+    logger.info("Retrieving Dividends of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        dividends = stock.dividends.to_dict()
+        dividends = serialize(_fetch(ticker, "dividends"), name="dividends")
 
         if dividends is None:
             return "No dividends available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Dividends of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Dividends of %s in %.3f seconds", ticker, end_time - start_time)
         return dividends
 
     except Exception as e:
-        logger.error(f"Failed to retrieve dividends of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve dividends of %s: %s", ticker, e)
         return "Error: Failed to retrieve dividends. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -226,25 +349,24 @@ def get_dividends(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_splits', description="A function that returns the stock split history of a given ticker")
 def get_splits(ticker: str):
-    logger.info(f"Retrieving Stock Splits of {ticker}")
+    logger.info("Retrieving Stock Splits of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        splits = stock.splits.to_dict()
+        splits = serialize(_fetch(ticker, "splits"), name="splits")
 
         if splits is None:
             return "No stock splits available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Stock Splits of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Stock Splits of %s in %.3f seconds", ticker, end_time - start_time)
         return splits
 
     except Exception as e:
-        logger.error(f"Failed to retrieve stock splits of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve stock splits of %s: %s", ticker, e)
         return "Error: Failed to retrieve stock splits. Please try again later."
 
 
@@ -253,25 +375,24 @@ def get_splits(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_institutional_holders', description="A function that returns the institutional ownership data of a given ticker")
 def get_institutional_holders(ticker: str):
-    logger.info(f"Retrieving Institutional Holders of {ticker}")
+    logger.info("Retrieving Institutional Holders of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        holders = stock.institutional_holders.to_dict()
+        holders = serialize(_fetch(ticker, "institutional_holders"), name="institutional_holders")
 
         if holders is None:
             return "No institutional holders available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Institutional Holders of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Institutional Holders of %s in %.3f seconds", ticker, end_time - start_time)
         return holders
 
     except Exception as e:
-        logger.error(f"Failed to retrieve institutional holders of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve institutional holders of %s: %s", ticker, e)
         return "Error: Failed to retrieve institutional holders. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -279,25 +400,24 @@ def get_institutional_holders(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_major_shareholders', description="A function that returns the major share holder data of a given ticker")
 def get_major_shareholders(ticker: str):
-    logger.info(f"Retrieving Major Share Holders of {ticker}")
+    logger.info("Retrieving Major Share Holders of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        holders = stock.major_holders.to_dict()
+        holders = serialize(_fetch(ticker, "major_holders"), name="major_holders")
 
         if holders is None:
             return "No major share holders available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Major Share Holders of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Major Share Holders of %s in %.3f seconds", ticker, end_time - start_time)
         return holders
 
     except Exception as e:
-        logger.error(f"Failed to retrieve major share holders of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve major share holders of %s: %s", ticker, e)
         return "Error: Failed to retrieve major share holders. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -305,25 +425,24 @@ def get_major_shareholders(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_mutual_fund_holders', description="A function that returns the mutual fund ownership data of a given ticker")
 def get_mutual_fund_holders(ticker: str):
-    logger.info(f"Retrieving Mutual Fund Holders of {ticker}")
+    logger.info("Retrieving Mutual Fund Holders of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        holders = stock.mutualfund_holders.to_dict()
+        holders = serialize(_fetch(ticker, "mutualfund_holders"), name="mutualfund_holders")
 
         if holders is None:
             return "No mutual fund holders available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Mutual Fund Holders of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Mutual Fund Holders of %s in %.3f seconds", ticker, end_time - start_time)
         return holders
 
     except Exception as e:
-        logger.error(f"Failed to retrieve mutual fund holders of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve mutual fund holders of %s: %s", ticker, e)
         return "Error: Failed to retrieve mutual fund holders. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -331,25 +450,24 @@ def get_mutual_fund_holders(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_insider_transactions', description="A function that returns the insider buy/sell transactions of a given ticker")
 def get_insider_transactions(ticker: str):
-    logger.info(f"Retrieving Insider Transactions of {ticker}")
+    logger.info("Retrieving Insider Transactions of %s", ticker)
 
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        insider_txn = stock.insider_transactions.to_dict()
+        insider_txn = serialize(_fetch(ticker, "insider_transactions"), name="insider_transactions")
 
         if insider_txn is None:
             return "No insider transactions available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Insider Transactions of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Insider Transactions of %s in %.3f seconds", ticker, end_time - start_time)
         return insider_txn
 
     except Exception as e:
-        logger.error(f"Failed to retrieve insider transactions of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve insider transactions of %s: %s", ticker, e)
         return "Error: Failed to retrieve insider transactions. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -357,25 +475,24 @@ def get_insider_transactions(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_analyst_recommendations', description="A function that returns the analyst recommendations of a given ticker")
 def get_analyst_recommendations(ticker: str):
-    logger.info(f"Retrieving Analyst Recommendations of {ticker}")
+    logger.info("Retrieving Analyst Recommendations of %s", ticker)
     
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        recommendations = stock.recommendations.to_dict()
+        recommendations = serialize(_fetch(ticker, "recommendations"), name="recommendations")
 
         if recommendations is None:
             return "No analyst recommendations available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Analyst Recommendations of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Analyst Recommendations of %s in %.3f seconds", ticker, end_time - start_time)
         return recommendations
 
     except Exception as e:
-        logger.error(f"Failed to retrieve analyst recommendations of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve analyst recommendations of %s: %s", ticker, e)
         return "Error: Failed to retrieve analyst recommendations. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -383,25 +500,24 @@ def get_analyst_recommendations(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_analyst_recommendations_summary', description="A function that returns the analyst recommendations summary of a given ticker")
 def get_analyst_recommendations_summary(ticker: str):
-    logger.info(f"Retrieving Analyst Recommendations Summary of {ticker}")
+    logger.info("Retrieving Analyst Recommendations Summary of %s", ticker)
     
     if not ticker or not isinstance(ticker, str):
         return "Error: Invalid ticker provided. Please provide a valid ticker symbol."
 
     try:
         start_time = time.time()
-        stock = yf.Ticker(ticker)
-        recommendations = stock.recommendations_summary.to_dict()
+        recommendations = serialize(_fetch(ticker, "recommendations_summary"), name="recommendations_summary")
 
         if recommendations is None:
             return "No analyst recommendations summary available for {ticker}"
 
         end_time = time.time()
-        logger.info(f"Retrieved Analyst Recommendations Summary of {ticker} in {end_time - start_time:.3f} seconds")
+        logger.info("Retrieved Analyst Recommendations Summary of %s in %.3f seconds", ticker, end_time - start_time)
         return recommendations
 
     except Exception as e:
-        logger.error(f"Failed to retrieve analyst recommendations summary of {ticker}: {str(e)}")
+        logger.error("Failed to retrieve analyst recommendations summary of %s: %s", ticker, e)
         return "Error: Failed to retrieve analyst recommendations summary. Please try again later."
 
 # --------------------------------------------------------------------------------
@@ -409,25 +525,181 @@ def get_analyst_recommendations_summary(ticker: str):
 # --------------------------------------------------------------------------------
 @tool('get_ticker', description="A function that returns the ticker/symbol of a given company")
 def get_ticker(company_name: str):
-    logger.info("Retrieving Ticker of {company_name}")
+    logger.info("Retrieving Ticker of %s", company_name)
     
     if not company_name or not isinstance(company_name, str):
         return "Error: Invalid company name provided. Please provide a valid company name."
 
     try:
         start_time = time.time()
-        url = f"https://query2.finance.yahoo.com/v1/finance/search?q={company_name}"
-        response = requests.get(url)
+        ticker = symbol_index.resolve(company_name)
+        if ticker is not None:
+            end_time = time.time()
+            logger.info("Resolved Ticker of %s from the local index in %.6f seconds", company_name, end_time - start_time)
+            return ticker
+
+        url = "https://query2.finance.yahoo.com/v1/finance/search"
+        response = inflight.do((company_name.strip().lower(), "search"),
+                               lambda: upstream.get(url, params={"q": company_name}))
         
         if response.status_code == 200:
             data = response.json()
             ticker = data['quotes'][0]['symbol']
+            symbol_index.add(company_name, ticker)
             end_time = time.time()
-            logger.info(f"Retrieved Ticker of {company_name} in {end_time - start_time:.3f} seconds")
+            logger.info("Retrieved Ticker of %s in %.3f seconds", company_name, end_time - start_time)
             return ticker
         else:
             return "Error: Failed to retrieve ticker. Please try again later."
             
     except Exception as e:
-        logger.error(f"Failed to retrieve ticker of {company_name}: {str(e)}")
-        return "Error: Failed to retrieve ticker. Please try again later."
\ No newline at end of file
+        logger.error("Failed to retrieve ticker of %s: %s", company_name, e)
+        return "Error: Failed to retrieve ticker. Please try again later."
+
+
+# --------------------------------------------------------------------------------
+# Tool 17: Retrieve Stock Prices of Multiple Tickers
+# --------------------------------------------------------------------------------
+@tool('get_stock_prices', description="A function that returns the current stock price, previous close and day change of several tickers in one call. Prefer it over repeated get_stock_price calls when comparing companies")
+def get_stock_prices(tickers: list[str]):
+    logger.info("Retrieving Stock Prices of %s", tickers)
+
+    symbols = _normalize_tickers(tickers)
+    if not symbols:
+        return "Error: Invalid tickers provided. Please provide a list of valid ticker symbols."
+
+    try:
+        start_time = time.time()
+        infos = _fetch_many(symbols, lambda symbol: _fetch(symbol, "info"))
+
+        rows = {}
+        for symbol, info in infos.items():
+            if isinstance(info, Exception) or not info:
+                logger.error("Failed to retrieve stock price of %s: %s", symbol, info)
+                rows[symbol] = {"price": None}
+                continue
+            price, previous = info.get("regularMarketPrice"), info.get("previousClose")
+            rows[symbol] = {
+                "price": price,
+                "previous_close": previous,
+                "change_pct": (price / previous - 1) * 100 if price and previous else None,
+                "currency": info.get("currency"),
+            }
+        prices = serialize(pd.DataFrame.from_dict(rows, orient="index"), name="prices")
+
+        end_time = time.time()
+        logger.info("Retrieved Stock Prices of %s tickers in %.3f seconds", len(symbols), end_time - start_time)
+        return prices
+
+    except Exception as e:
+        logger.error("Failed to retrieve stock prices of %s: %s", tickers, e)
+        return "Error: Failed to retrieve stock prices. Please try again later."
+
+
+# --------------------------------------------------------------------------------
+# Tool 18: Retrieve Historical Closing Prices of Multiple Tickers
+# --------------------------------------------------------------------------------
+@tool('get_historical_data_batch', description="A function that returns date-aligned daily closing prices of several tickers between the given start and end date in one call. Prefer it over repeated get_historical_data calls when comparing companies")
+def get_historical_data_batch(tickers: list[str], start_date: str, end_date: str):
+    logger.info("Retrieving Historical Data of %s", tickers)
+
+    symbols = _normalize_tickers(tickers)
+    if not symbols:
+        return "Error: Invalid tickers provided. Please provide a list of valid ticker symbols."
+
+    try:
+        start_time = time.time()
+        histories = _fetch_many(symbols, lambda symbol: _history(symbol, start_date, end_date)["Close"])
+
+        closes = {}
+        for symbol, close in histories.items():
+            if isinstance(close, Exception):
+                logger.error("Failed to retrieve historical data of %s: %s", symbol, close)
+                continue
+            closes[symbol] = close
+
+        if not closes:
+            return f"No historical data available for {', '.join(symbols)}"
+
+        historical_data = serialize(pd.DataFrame(closes), name="history_batch")
+
+        end_time = time.time()
+        logger.info("Retrieved Historical Data of %s tickers in %.3f seconds", len(closes), end_time - start_time)
+        return historical_data
+
+    except Exception as e:
+        logger.error("Failed to retrieve historical data of %s: %s", tickers, e)
+        return "Error: Failed to retrieve historical data. Please try again later."
+
+
+# --------------------------------------------------------------------------------
+# Tool 19: Compute Technical Indicators of One or More Tickers
+# --------------------------------------------------------------------------------
+@tool('get_technical_indicators', description="A function that computes technical indicators from daily prices for one or more tickers in one call: SMA and EMA for the given windows (default 20, 50, 200 days), RSI(14), MACD(12,26,9), Bollinger bands(20,2) with %B, annualized 20/60-day volatility, current and maximum drawdown over the last year, and 1w/1m/3m/6m/1y/YTD returns in percent. Use it instead of fetching raw historical data to judge trends or momentum")
+def get_technical_indicators(tickers: list[str], windows: list[int] | None = None, end_date: str | None = None):
+    logger.info("Computing Technical Indicators of %s", tickers)
+
+    symbols = _normalize_tickers(tickers)
+    if not symbols:
+        return "Error: Invalid tickers provided. Please provide a list of valid ticker symbols."
+    windows = tuple(sorted({int(w) for w in windows if 1 < int(w) <= 400})) if windows else DEFAULT_WINDOWS
+    if not windows:
+        return "Error: Invalid windows provided. Please provide window lengths between 2 and 400 days."
+
+    try:
+        start_time = time.time()
+        end = pd.Timestamp(end_date) if end_date else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        # Enough calendar days for the longest window and a one-year return, plus warm-up
+        start = end - pd.Timedelta(days=max(400, int(max(windows) * 1.5) + 60))
+        histories = _fetch_many(symbols, lambda symbol: _history(symbol, f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")["Close"])
+
+        rows = {}
+        for symbol, close in histories.items():
+            if isinstance(close, Exception):
+                logger.error("Failed to retrieve historical data of %s: %s", symbol, close)
+                continue
+            row = summarize(close, windows)
+            if row:
+                rows[symbol] = row
+
+        if not rows:
+            return f"No historical data available for {', '.join(symbols)}"
+
+        indicators = serialize(pd.DataFrame.from_dict(rows, orient="index"), name="technical_indicators")
+
+        end_time = time.time()
+        logger.info("Computed Technical Indicators of %s tickers in %.3f seconds", len(rows), end_time - start_time)
+        return indicators
+
+    except Exception as e:
+        logger.error("Failed to compute technical indicators of %s: %s", tickers, e)
+        return "Error: Failed to compute technical indicators. Please try again later."
+
+
+# --------------------------------------------------------------------------------
+# Tool 20: Screen Stocks by Fundamentals
+# --------------------------------------------------------------------------------
+@tool('screen_stocks', description="A function that screens a universe of popular stocks by fundamentals and returns the top matches. Each filter is '<field> <op> <value>', e.g. 'sector == Technology', 'industry ~ bank' (contains), 'marketCap >= 100B', 'trailingPE < 20'. Fields: longName, sector, industry, country, currency, marketCap, currentPrice, trailingPE, forwardPE, priceToBook, dividendYield (percent), payoutRatio, profitMargins, operatingMargins, grossMargins, returnOnEquity, revenueGrowth, earningsGrowth, debtToEquity, beta. Optionally sort by a field (descending by default) and limit the number of results")
+def screen_stocks(filters: list[str] | None = None, sort_by: str | None = None, descending: bool = True, limit: int = 10):
+    logger.info("Screening Stocks by %s sorted by %s", filters, sort_by)
+
+    try:
+        start_time = time.time()
+        from MarketInsight.components.screener import screener
+        matches, total = screener.screen(filters, sort_by, descending, limit)
+
+        if matches.empty:
+            return f"No stocks in the screening universe of {len(screener.universe)} tickers match {filters}"
+
+        results = serialize(matches, name="screen")
+
+        end_time = time.time()
+        logger.info("Screened %s matches of %s tickers in %.3f seconds", total, len(screener.universe), end_time - start_time)
+        return f"{len(matches)} of {total} matches\n{results}"
+
+    except ValueError as e:
+        return f"Error: {e}"
+
+    except Exception as e:
+        logger.error("Failed to screen stocks by %s: %s", filters, e)
+        return "Error: Failed to screen stocks. Please try again later."
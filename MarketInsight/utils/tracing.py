@@ -0,0 +1,95 @@
+import os
+import zlib
+import threading
+from config.config import (
+    TRACING_ENABLED, TRACE_SAMPLE_RATE, TRACE_ALWAYS_USERS, TRACE_NEVER_USERS, TRACE_FLUSH_AT, TRACE_FLUSH_INTERVAL,
+)
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Tracing")
+
+
+class RequestTrace:
+    """Langfuse span and nested generation for one chat request.
+
+    Streamed chunks are collected in a list and joined once when the request ends.
+    """
+
+    def __init__(self, client, prompt: str, user_id: str):
+        self.span = client.start_observation(as_type="span", name="chat-request", input=prompt,
+                                             metadata={"user_id": user_id})
+        self.generation = self.span.start_observation(as_type="generation", name="agent-stream",
+                                                      model="agentic-workflow", input=prompt)
+        self._chunks: list[str] = []
+
+    def add(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+
+    def end(self, error: BaseException | None = None) -> None:
+        output = "".join(self._chunks)
+        if error is None:
+            self.generation.update(output=output)
+            self.span.update(output="Request completed successfully")
+        else:
+            self.generation.update(output=output, level="ERROR", status_message=str(error))
+            self.span.update(level="ERROR", status_message=str(error))
+        self.generation.end()
+        self.span.end()
+
+
+class Tracer:
+    """Decides per request whether to trace and owns the (lazily created) Langfuse client.
+
+    Sampling is deterministic per user/thread ID, so a conversation is traced either
+    completely or not at all; IDs in ``always_users``/``never_users`` override the rate.
+    Spans are exported by the Langfuse client's background batch processor. When
+    tracing is disabled or a request is not sampled, ``start_request`` returns None
+    and the request path does no tracing work at all.
+    """
+
+    def __init__(self, enabled: bool = TRACING_ENABLED, sample_rate: float = TRACE_SAMPLE_RATE,
+                 always_users: set[str] = TRACE_ALWAYS_USERS, never_users: set[str] = TRACE_NEVER_USERS):
+        self.enabled = enabled and bool(os.getenv("LANGFUSE_PUBLIC_KEY") and os.getenv("LANGFUSE_SECRET_KEY"))
+        self.sample_rate = sample_rate
+        self.always_users = always_users
+        self.never_users = never_users
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langfuse import Langfuse
+
+                    self._client = Langfuse(
+                        public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+                        secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+                        host=os.getenv("LANGFUSE_HOST"),
+                        flush_at=TRACE_FLUSH_AT,
+                        flush_interval=TRACE_FLUSH_INTERVAL,
+                    )
+        return self._client
+
+    def sampled(self, user_id: str) -> bool:
+        if user_id in self.never_users:
+            return False
+        if user_id in self.always_users:
+            return True
+        return zlib.crc32(user_id.encode()) / 0xFFFFFFFF < self.sample_rate
+
+    def start_request(self, prompt: str, user_id: str) -> RequestTrace | None:
+        if not self.enabled or not self.sampled(user_id):
+            return None
+        try:
+            return RequestTrace(self._get_client(), prompt, user_id)
+        except Exception as e:
+            logger.error("Failed to start trace: %s", e)
+            return None
+
+    def shutdown(self) -> None:
+        if self._client is not None:
+            self._client.flush()
+
+
+tracer = Tracer()
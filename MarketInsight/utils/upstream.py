@@ -0,0 +1,197 @@
+import time
+import random
+import threading
+import functools
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable
+from config.config import (
+    UPSTREAM_RATE_LIMIT, UPSTREAM_BURST, UPSTREAM_TIMEOUT, UPSTREAM_POOL_SIZE, UPSTREAM_MAX_RETRIES,
+    UPSTREAM_BACKOFF_BASE, UPSTREAM_BREAKER_THRESHOLD, UPSTREAM_BREAKER_RESET,
+)
+from MarketInsight.utils.logger import get_logger
+
+logger = get_logger("Upstream")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UpstreamHTTPError(Exception):
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.status_code = status_code
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+@functools.cache
+def _transient_errors() -> tuple[type[BaseException], ...]:
+    # Resolved on first use: importing yfinance pulls in pandas and slows startup
+    errors = [requests.ConnectionError, requests.Timeout, TimeoutError]
+    try:
+        from curl_cffi.requests.exceptions import ConnectionError as CurlConnectionError, Timeout as CurlTimeout
+        errors += [CurlConnectionError, CurlTimeout]
+    except ImportError:
+        pass
+    try:
+        from yfinance.exceptions import YFRateLimitError
+        errors.append(YFRateLimitError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, UpstreamHTTPError):
+        return exc.status_code in RETRYABLE_STATUS
+    return isinstance(exc, _transient_errors())
+
+
+# --------------------------------------------------------------------------------
+# Global token bucket
+# --------------------------------------------------------------------------------
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def available(self) -> float:
+        """Tokens that could be spent right now."""
+        with self._lock:
+            return min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate)
+
+    def acquire(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# --------------------------------------------------------------------------------
+# Circuit breaker
+# --------------------------------------------------------------------------------
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive transient failures and fails fast for
+    ``reset_timeout`` seconds, then lets a single trial call through (half-open)."""
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self) -> None:
+        """Give back an allowed call that never reached upstream, so a later one can be the trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning("Upstream circuit opened after %s consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+
+
+# --------------------------------------------------------------------------------
+# Shared client
+# --------------------------------------------------------------------------------
+class UpstreamClient:
+    """Single entry point for upstream traffic: rate limit, retry with jittered
+    exponential backoff and a circuit breaker around every call.
+
+    Raw HTTP goes through a pooled keep-alive ``requests.Session``; yfinance keeps its
+    own shared session, so its calls are wrapped with ``call``.
+    """
+
+    def __init__(self):
+        self.bucket = TokenBucket(UPSTREAM_RATE_LIMIT, UPSTREAM_BURST)
+        self.breaker = CircuitBreaker(UPSTREAM_BREAKER_THRESHOLD, UPSTREAM_BREAKER_RESET)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=UPSTREAM_POOL_SIZE, pool_maxsize=UPSTREAM_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "Mozilla/5.0 (compatible; MarketInsight/1.0)"
+
+    def call(self, fn: Callable[[], Any], name: str = "upstream") -> Any:
+        last_error = None
+        for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Upstream circuit is open, not calling {name}")
+            if not self.bucket.acquire(timeout=UPSTREAM_TIMEOUT):
+                self.breaker.release_trial()
+                raise TimeoutError(f"Rate limit wait exceeded {UPSTREAM_TIMEOUT}s for {name}")
+
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                last_error = e
+                if attempt < UPSTREAM_MAX_RETRIES:
+                    delay = random.uniform(0, UPSTREAM_BACKOFF_BASE * 2 ** attempt)
+                    logger.warning("Transient error from %s (%s), retrying in %.2fs", name, e, delay)
+                    time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        raise last_error
+
+    def get(self, url: str, params: dict | None = None) -> requests.Response:
+        def request():
+            response = self.session.get(url, params=params, timeout=UPSTREAM_TIMEOUT)
+            if response.status_code in RETRYABLE_STATUS:
+                raise UpstreamHTTPError(response.status_code, url)
+            return response
+
+        return self.call(request, name=url)
+
+
+upstream = UpstreamClient()
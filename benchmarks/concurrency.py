@@ -0,0 +1,114 @@
+"""
+Time-to-first-token under concurrent chats.
+
+Runs the real FastAPI app on a local port with a scripted chat model and a yfinance
+stand-in whose calls block for --tool-latency seconds, then opens 1..N concurrent
+/api/chat streams and probes /health while they run. With the async agent path
+the TTFT and /health latency should stay flat as concurrency grows.
+
+    python -m benchmarks.concurrency --levels 1 5 10 25 50
+"""
+import os
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import statistics
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+# Every client asks the same question; answer cache hits would skip the agent entirely
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+os.environ.setdefault("SCREENER_ENABLED", "false")
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+
+import httpx
+import uvicorn
+from langchain.agents import create_agent
+from langgraph.checkpoint.memory import MemorySaver
+from benchmarks.fakes import ScriptedChatModel, install_fake_yfinance
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app) -> tuple[uvicorn.Server, str]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def one_chat(client: httpx.AsyncClient, index: int) -> tuple[float, float]:
+    body = {
+        "prompt": {"content": "What is AAPL trading at?", "id": f"p{index}", "role": "user"},
+        "threadId": f"bench-{index}-{time.monotonic_ns()}",
+        "responseId": f"r{index}",
+    }
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", "/api/chat", json=body) as response:
+        async for chunk in response.aiter_text():
+            if chunk and first is None:
+                first = time.perf_counter() - start
+    return first or float("nan"), time.perf_counter() - start
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run_level(base_url: str, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        stop, health = asyncio.Event(), []
+        prober = asyncio.create_task(probe_health(client, stop, health))
+        results = await asyncio.gather(*(one_chat(client, i) for i in range(concurrency)))
+        stop.set()
+        await prober
+
+    ttft = sorted(r[0] for r in results)
+    total = sorted(r[1] for r in results)
+    return {
+        "concurrency": concurrency,
+        "ttft_p50": statistics.median(ttft),
+        "ttft_max": ttft[-1],
+        "total_p50": statistics.median(total),
+        "health_max": max(health) if health else float("nan"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--tool-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    install_fake_yfinance(args.tool_latency)
+
+    import main as service
+    from MarketInsight.utils.tools import get_stock_price
+    from MarketInsight.components import agent as agent_module
+    agent_module.agent = create_agent(ScriptedChatModel(), tools=[get_stock_price], checkpointer=MemorySaver())
+
+    server, base_url = start_server(service.app)
+    print(f"{'clients':>8} {'ttft p50':>10} {'ttft max':>10} {'total p50':>10} {'/health max':>12}")
+    for level in args.levels:
+        row = asyncio.run(run_level(base_url, level))
+        print(f"{row['concurrency']:>8} {row['ttft_p50']:>9.3f}s {row['ttft_max']:>9.3f}s "
+              f"{row['total_p50']:>9.3f}s {row['health_max']:>11.3f}s")
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import json
+import time
+import uuid
+import zlib
+import random
+import asyncio
+import threading
+from typing import Any
+from pathlib import Path
+from collections import Counter
+import numpy as np
+import pandas as pd
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.language_models.chat_models import BaseChatModel
+
+
+# --------------------------------------------------------------------------------
+# Scripted chat model: tool-call steps, then a streamed answer
+# --------------------------------------------------------------------------------
+class ScriptedChatModel(BaseChatModel):
+    """Offline stand-in for ChatOpenAI: requests ``tool_calls`` in one step, then streams ``answer``.
+
+    ``scripts`` maps a prompt to ``{"steps": [[call, ...], ...], "answer": str}`` so a
+    recorded conversation can replay several tool-call steps per turn; prompts
+    without a script fall back to ``tool_calls``/``answer``.
+    """
+
+    tool_calls: list[dict] = [{"name": "get_stock_price", "args": {"ticker": "AAPL"}}]
+    answer: str = "Apple is trading at the price returned by the tool, based on the latest available quote."
+    scripts: dict[str, dict] = {}
+    token_delay: float = 0.005
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _script(self, messages) -> tuple[list[list[dict]], str]:
+        prompt = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        script = self.scripts.get(prompt)
+        if script is None:
+            return ([self.tool_calls] if self.tool_calls else []), self.answer
+        return script.get("steps", []), script["answer"]
+
+    def _next_step(self, messages) -> list[dict] | None:
+        """Tool calls to request next, or None once every step of the turn has run."""
+        steps, _ = self._script(messages)
+        done = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage) and message.tool_calls:
+                done += 1
+        return steps[done] if done < len(steps) else None
+
+    def _tool_call_message(self, calls: list[dict]) -> AIMessage:
+        return AIMessage(content="", tool_calls=[
+            {"name": call["name"], "args": call["args"], "id": f"call_{uuid.uuid4().hex[:12]}"} for call in calls
+        ])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        calls = self._next_step(messages)
+        message = self._tool_call_message(calls) if calls else AIMessage(content=self._script(messages)[1])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        calls = self._next_step(messages)
+        if calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(self._tool_call_message(calls).tool_calls)
+            ]))
+            return
+
+        for word in self._script(messages)[1].split(" "):
+            await asyncio.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+# --------------------------------------------------------------------------------
+# yfinance stand-in with blocking, configurable latency and fixture data
+# --------------------------------------------------------------------------------
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class FakeTicker:
+    """Blocking replacement for ``yf.Ticker`` covering every attribute the tools read.
+
+    Each access sleeps ``latency`` (plus up to ``jitter``) seconds. ``info`` comes from
+    ``fixtures`` when the symbol is listed there; everything else is generated from a
+    per-symbol seed, so the same ticker always returns the same data.
+    """
+
+    latency = 0.5
+    jitter = 0.0
+    fixtures: dict[str, dict] = {}
+    calls: Counter = Counter()
+    _lock = threading.Lock()
+
+    def __init__(self, ticker: str, *args, **kwargs):
+        self.ticker = ticker.upper()
+        self._seed = zlib.crc32(self.ticker.encode())
+
+    def _wait(self, dataset: str) -> None:
+        with self._lock:
+            self.calls[dataset] += 1
+        time.sleep(self.latency + (random.random() * self.jitter if self.jitter else 0.0))
+
+    def _rng(self) -> np.random.Generator:
+        return np.random.default_rng(self._seed)
+
+    def _price(self) -> float:
+        return self.fixtures.get(self.ticker, {}).get("currentPrice") or float(20 + self._seed % 480)
+
+    @property
+    def info(self) -> dict:
+        self._wait("info")
+        price = self._price()
+        info = {
+            "symbol": self.ticker, "shortName": f"{self.ticker} Inc.", "longName": f"{self.ticker} Incorporated",
+            "sector": "Technology", "industry": "Software", "country": "United States", "currency": "USD",
+            "currentPrice": price, "regularMarketPrice": price, "previousClose": round(price * 0.99, 2),
+            "marketCap": int(price * 1e9), "trailingPE": 25.0, "forwardPE": 22.0, "dividendYield": 0.5,
+            "beta": 1.1, "profitMargins": 0.2, "operatingMargins": 0.25, "grossMargins": 0.5,
+            "longBusinessSummary": f"{self.ticker} makes products. " * 40,
+        }
+        info.update(self.fixtures.get(self.ticker, {}))
+        return info
+
+    def history(self, start=None, end=None, period=None, **kwargs) -> pd.DataFrame:
+        self._wait("history")
+        today = pd.Timestamp.today().normalize()
+        end = min(pd.Timestamp(end), today + pd.Timedelta(days=1)) if end is not None else today + pd.Timedelta(days=1)
+        start = pd.Timestamp(start) if start is not None else end - pd.DateOffset(years=1)
+        # Walk over a fixed calendar ending at the current price, so overlapping ranges agree
+        dates = pd.bdate_range("2000-01-03", today)
+        walk = np.cumsum(self._rng().normal(0, 0.015, len(dates)))
+        closes = self._price() * np.exp(walk - walk[-1])
+        frame = pd.DataFrame({
+            "Open": closes * 0.995, "High": closes * 1.01, "Low": closes * 0.99, "Close": closes,
+            "Volume": np.full(len(dates), 1_000_000.0), "Dividends": 0.0, "Stock Splits": 0.0,
+        }, index=pd.DatetimeIndex(dates, name="Date"))
+        return frame.loc[start:end - pd.Timedelta(days=1)]
+
+    @property
+    def news(self) -> list[dict]:
+        self._wait("news")
+        return [{"content": {
+            "title": f"{self.ticker} headline {i}", "summary": f"What happened to {self.ticker} today, part {i}.",
+            "pubDate": f"2025-01-{i + 1:02d}T12:00:00Z", "provider": {"displayName": "Benchmark Wire"},
+            "canonicalUrl": {"url": f"https://example.com/{self.ticker}/{i}"},
+        }} for i in range(10)]
+
+    def _statement(self, dataset: str, rows: list[str]) -> pd.DataFrame:
+        self._wait(dataset)
+        columns = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31"])
+        return pd.DataFrame(self._rng().uniform(1e8, 1e11, (len(rows), len(columns))), index=rows, columns=columns)
+
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self._statement("balance_sheet", ["Total Assets", "Total Liabilities Net Minority Interest",
+                                                 "Stockholders Equity", "Cash And Cash Equivalents", "Total Debt"])
+
+    @property
+    def financials(self) -> pd.DataFrame:
+        return self._statement("financials", ["Total Revenue", "Gross Profit", "Operating Income", "Net Income", "EBITDA"])
+
+    @property
+    def cashflow(self) -> pd.DataFrame:
+        return self._statement("cashflow", ["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow",
+                                            "Repurchase Of Capital Stock", "Cash Dividends Paid"])
+
+    @property
+    def dividends(self) -> pd.Series:
+        self._wait("dividends")
+        dates = pd.date_range("2015-02-15", periods=40, freq="QS-FEB", tz="America/New_York")
+        return pd.Series(np.linspace(0.1, 0.3, len(dates)), index=dates, name="Dividends")
+
+    @property
+    def splits(self) -> pd.Series:
+        self._wait("splits")
+        return pd.Series([4.0], index=pd.DatetimeIndex(["2020-08-31"], tz="America/New_York"), name="Stock Splits")
+
+    def _holders(self, dataset: str) -> pd.DataFrame:
+        self._wait(dataset)
+        return pd.DataFrame({
+            "Date Reported": pd.Timestamp("2025-06-30"),
+            "Holder": [f"Fund {i}" for i in range(10)],
+            "pctHeld": np.linspace(0.08, 0.01, 10),
+            "Shares": np.arange(10, 0, -1) * 10_000_000,
+            "Value": np.arange(10, 0, -1) * 1e9,
+        })
+
+    @property
+    def institutional_holders(self) -> pd.DataFrame:
+        return self._holders("institutional_holders")
+
+    @property
+    def mutualfund_holders(self) -> pd.DataFrame:
+        return self._holders("mutualfund_holders")
+
+    @property
+    def major_holders(self) -> pd.DataFrame:
+        self._wait("major_holders")
+        return pd.DataFrame({"Value": [0.01, 0.6, 0.61, 5000.0]},
+                            index=["insidersPercentHeld", "institutionsPercentHeld",
+                                   "institutionsFloatPercentHeld", "institutionsCount"])
+
+    @property
+    def insider_transactions(self) -> pd.DataFrame:
+        self._wait("insider_transactions")
+        return pd.DataFrame({
+            "Shares": np.arange(1, 21) * 1000, "Value": np.arange(1, 21) * 150_000.0,
+            "Text": ["Sale at price 150.00 per share."] * 20, "Insider": [f"Officer {i}" for i in range(20)],
+            "Position": "Officer", "Start Date": pd.date_range("2025-01-01", periods=20, freq="W"),
+        })
+
+    @property
+    def recommendations(self) -> pd.DataFrame:
+        self._wait("recommendations")
+        return pd.DataFrame({"period": ["0m", "-1m", "-2m", "-3m"], "strongBuy": [10, 9, 9, 8], "buy": [20, 21, 20, 19],
+                             "hold": [8, 8, 9, 10], "sell": [1, 1, 1, 2], "strongSell": [0, 0, 1, 1]})
+
+    @property
+    def recommendations_summary(self) -> pd.DataFrame:
+        return self.recommendations
+
+
+def load_fixtures(path: str | Path = FIXTURES_DIR / "market.json") -> dict[str, dict]:
+    with open(path) as f:
+        return {symbol.upper(): info for symbol, info in json.load(f).items()}
+
+
+def install_fake_yfinance(latency: float = 0.5, jitter: float = 0.0, fixtures: dict[str, dict] | None = None) -> None:
+    """Point the tools module at FakeTicker so no request leaves the process."""
+    from MarketInsight.utils import tools
+
+    FakeTicker.latency = latency
+    FakeTicker.jitter = jitter
+    FakeTicker.fixtures = load_fixtures() if fixtures is None else fixtures
+    FakeTicker.calls.clear()
+    tools.yf.Ticker = FakeTicker
@@ -0,0 +1,231 @@
+"""
+Offline load test of the whole chat pipeline.
+
+Serves the real FastAPI app (agent graph, middleware, tools, checkpointer, streaming)
+on a local port with a scripted chat model and a fixture-backed yfinance stand-in,
+then replays the recorded conversation mix in benchmarks/fixtures/conversations.json
+from N concurrent clients. Each level reports p50/p95/p99 time-to-first-token and
+total latency per turn, throughput, errors and process memory growth.
+
+    python -m benchmarks.loadtest --levels 1 10 50 --conversations 200
+    python -m benchmarks.loadtest --save baseline.json
+    python -m benchmarks.loadtest --baseline baseline.json --tolerance 0.2
+
+With --baseline the run exits non-zero when a latency percentile or the throughput
+of any level regresses by more than the tolerance. The answer cache, tracing, the
+screener refresh and background prefetch (unless --prefetch) are disabled and all
+on-disk state goes to a temporary directory; upstream rate limits still apply unless overridden
+(e.g. UPSTREAM_RATE_LIMIT=1000 UPSTREAM_BURST=1000).
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+WORKDIR = tempfile.mkdtemp(prefix="marketinsight-loadtest-")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+os.environ.setdefault("TRACING_ENABLED", "false")
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+os.environ.setdefault("SCREENER_ENABLED", "false")
+os.environ.setdefault("PRICE_STORE_DIR", os.path.join(WORKDIR, "prices"))
+os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(WORKDIR, "market.sqlite"))
+os.environ.setdefault("CHECKPOINT_DB_PATH", os.path.join(WORKDIR, "checkpoints.sqlite"))
+os.environ.setdefault("LOG_DIR", os.path.join(WORKDIR, "logs"))
+
+import httpx
+from benchmarks.fakes import FIXTURES_DIR, FakeTicker, ScriptedChatModel, install_fake_yfinance, load_fixtures
+from benchmarks.concurrency import start_server
+
+# Metrics compared against a baseline and whether larger values are better
+TRACKED = {
+    "ttft_p50": False, "ttft_p95": False, "ttft_p99": False,
+    "total_p50": False, "total_p95": False, "total_p99": False,
+    "throughput": True,
+}
+
+
+def load_mix(path: str | Path) -> list[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (``q`` in 0..100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def one_turn(client: httpx.AsyncClient, thread_id: str, index: int, prompt: str) -> tuple[float, float, bool]:
+    body = {
+        "prompt": {"content": prompt, "id": f"p{index}", "role": "user"},
+        "threadId": thread_id,
+        "responseId": f"r{index}",
+    }
+    start = time.perf_counter()
+    first = None
+    try:
+        async with client.stream("POST", "/api/chat", json=body) as response:
+            async for chunk in response.aiter_text():
+                if chunk and first is None:
+                    first = time.perf_counter() - start
+            ok = response.status_code == 200 and first is not None
+    except httpx.HTTPError:
+        ok = False
+    return first or float("nan"), time.perf_counter() - start, ok
+
+
+async def run_level(base_url: str, mix: list[dict], concurrency: int, conversations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    queue = asyncio.Queue()
+    for conversation in rng.choices(mix, weights=[c.get("weight", 1) for c in mix], k=conversations):
+        queue.put_nowait(conversation)
+
+    ttft, total, errors = [], [], 0
+
+    async def client_loop(client: httpx.AsyncClient, worker: int) -> None:
+        nonlocal errors
+        while not queue.empty():
+            conversation = queue.get_nowait()
+            thread_id = f"load-{worker}-{time.monotonic_ns()}"
+            for index, turn in enumerate(conversation["turns"]):
+                first, elapsed, ok = await one_turn(client, thread_id, index, turn["prompt"])
+                if not ok:
+                    errors += 1
+                    break
+                ttft.append(first)
+                total.append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, worker) for worker in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "turns": len(total),
+        "errors": errors,
+        "throughput": len(total) / wall,
+        **{f"ttft_p{q}": percentile(ttft, q) for q in (50, 95, 99)},
+        **{f"total_p{q}": percentile(total, q) for q in (50, 95, 99)},
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Describe every tracked metric that is worse than the baseline by more than ``tolerance``."""
+    previous = {row["concurrency"]: row for row in baseline}
+    regressions = []
+    for row in results:
+        base = previous.get(row["concurrency"])
+        if base is None:
+            continue
+        for metric, higher_is_better in TRACKED.items():
+            old, new = base[metric], row[metric]
+            if not old or old != old or new != new:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                regressions.append(f"{row['concurrency']} clients: {metric} {old:.4g} -> {new:.4g} ({change:+.0%} worse)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--conversations", type=int, default=100, help="conversations replayed per level")
+    parser.add_argument("--mix", default=FIXTURES_DIR / "conversations.json", help="recorded conversation mix")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR / "market.json", help="per-symbol info fixtures")
+    parser.add_argument("--tool-latency", type=float, default=0.2, help="seconds per yfinance access")
+    parser.add_argument("--tool-jitter", type=float, default=0.1, help="extra random latency up to this many seconds")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between streamed answer tokens")
+    parser.add_argument("--cold", action="store_true", help="clear market data caches before every level")
+    parser.add_argument("--prefetch", action="store_true", help="run the background prefetcher during the test")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report the top allocation sites per level (slows the run; latencies are not comparable)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression vs. the baseline")
+    args = parser.parse_args()
+
+    if args.prefetch:
+        os.environ["PREFETCH_ENABLED"] = "true"
+    mix = load_mix(args.mix)
+    install_fake_yfinance(args.tool_latency, args.tool_jitter, load_fixtures(args.fixtures))
+
+    import main as service
+    from MarketInsight.utils import tools
+    from MarketInsight.utils.cache import market_cache
+    from MarketInsight.utils.shared_cache import shared_cache
+    from MarketInsight.utils.price_store import PriceStore
+    from MarketInsight.components import agent as agent_module
+
+    scripts = {turn["prompt"]: turn for conversation in mix for turn in conversation["turns"]}
+    agent_module.agent = agent_module.build_agent(ScriptedChatModel(scripts=scripts, token_delay=args.token_delay),
+                                                  agent_module.get_checkpointer())
+
+    server, base_url = start_server(service.app)
+    if args.tracemalloc:
+        tracemalloc.start(10)
+
+    print(f"{'clients':>7} {'turns':>6} {'err':>4} {'req/s':>7} {'ttft p50':>9} {'p95':>7} {'p99':>7} "
+          f"{'total p50':>10} {'p95':>7} {'p99':>7} {'mem':>9}")
+    results = []
+    for level in args.levels:
+        if args.cold:
+            market_cache.clear()
+            shared_cache.clear()
+            tools.price_store = PriceStore(root=tempfile.mkdtemp(dir=WORKDIR))
+        gc.collect()
+        rss_before = rss_bytes()
+        snapshot = tracemalloc.take_snapshot() if args.tracemalloc else None
+        FakeTicker.calls.clear()
+
+        row = asyncio.run(run_level(base_url, mix, level, args.conversations, args.seed))
+        gc.collect()
+        row["rss_growth"] = rss_bytes() - rss_before
+        row["upstream_calls"] = sum(FakeTicker.calls.values())
+        results.append(row)
+        print(f"{level:>7} {row['turns']:>6} {row['errors']:>4} {row['throughput']:>7.1f} "
+              f"{row['ttft_p50']:>8.3f}s {row['ttft_p95']:>6.3f}s {row['ttft_p99']:>6.3f}s "
+              f"{row['total_p50']:>9.3f}s {row['total_p95']:>6.3f}s {row['total_p99']:>6.3f}s "
+              f"{row['rss_growth'] / 2**20:>+7.1f}MB")
+        if snapshot is not None:
+            for stat in tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:5]:
+                print(f"{'':>9}{stat}")
+    server.should_exit = True
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cold-start cost of the service.
+
+Imports ``main`` in a fresh interpreter with ``-X importtime`` and breaks the import
+time down by top-level package, optionally including the deferred agent build,
+then starts uvicorn in a subprocess and measures how long it takes until /health
+answers.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --with-agent --top 25
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+import httpx
+from benchmarks.concurrency import _free_port
+
+ENV = {
+    **os.environ,
+    "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark"),
+    "PREFETCH_ENABLED": "false",
+    "SCREENER_ENABLED": "false",
+    "TRACING_ENABLED": "false",
+    "LOG_DIR": os.path.join(tempfile.mkdtemp(prefix="marketinsight-startup-"), "logs"),
+}
+
+
+def import_breakdown(code: str) -> tuple[float, dict[str, float]]:
+    """Total wall time of running ``code`` and self import time (seconds) per top-level package."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=ENV,
+                            capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - started
+
+    packages = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return elapsed, dict(packages)
+
+
+def time_to_health(timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              env=ENV)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        return float("nan")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--with-agent", action="store_true", help="also build the agent, as the first chat request does")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    code = "import main" + ("; main.get_agent()" if args.with_agent else "")
+    elapsed, packages = import_breakdown(code)
+    print(f"{code}: {elapsed:.3f}s wall, {sum(packages.values()):.3f}s importing")
+    print(f"{'package':>28} {'self time':>10}")
+    for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:>28} {seconds:>9.3f}s")
+
+    print(f"\nuvicorn main:app answered /health after {time_to_health(args.timeout):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
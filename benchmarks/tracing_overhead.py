@@ -0,0 +1,75 @@
+"""
+Per-request cost of Langfuse tracing on the /api/chat streaming path.
+
+Drives the chat endpoint's generator directly with a canned token stream, so the
+numbers isolate what tracing adds per request: nothing when disabled or sampled
+out, span bookkeeping only when sampled (export happens on Langfuse's background
+thread; the host here is unreachable so nothing leaves the machine).
+
+    python -m benchmarks.tracing_overhead --requests 2000 --tokens 200
+"""
+import os
+import time
+import asyncio
+import logging
+import argparse
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("LANGFUSE_PUBLIC_KEY", "pk-benchmark")
+os.environ.setdefault("LANGFUSE_SECRET_KEY", "sk-benchmark")
+os.environ.setdefault("LANGFUSE_HOST", "http://127.0.0.1:9")
+
+import main
+from fastapi import Request
+from config.config import RequestObject
+from MarketInsight.utils.tracing import Tracer
+
+# The exporter retries against the unreachable host in the background; keep it quiet
+logging.getLogger("opentelemetry").setLevel(logging.CRITICAL)
+
+
+def canned_stream(tokens: int):
+    async def stream_answer(prompt: str, config: dict, events: bool = False):
+        for i in range(tokens):
+            yield f"tok{i} "
+    return stream_answer
+
+
+async def connected() -> dict:
+    """ASGI receive channel of a client that stays connected."""
+    await asyncio.Event().wait()
+
+
+async def run(requests: int) -> float:
+    http_request = Request({"type": "http", "method": "POST", "path": "/api/chat", "headers": []}, receive=connected)
+    start = time.perf_counter()
+    for i in range(requests):
+        request = RequestObject(prompt={"content": "What is AAPL trading at?", "id": f"p{i}", "role": "user"},
+                                threadId=f"bench-{i}", responseId=f"r{i}")
+        response = await main.chat(request, http_request)
+        async for _ in response.body_iterator:
+            pass
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def bench(args: argparse.Namespace) -> None:
+    main.stream_answer = canned_stream(args.tokens)
+    modes = {
+        "disabled": Tracer(enabled=False),
+        "sampled out": Tracer(sample_rate=0.0),
+        f"sampled {args.sample_rate:.0%}": Tracer(sample_rate=args.sample_rate),
+        "sampled 100%": Tracer(sample_rate=1.0),
+    }
+    print(f"{'mode':>14} {'us/request':>11}")
+    for name, tracer in modes.items():
+        main.tracer = tracer
+        await run(min(args.requests, 100))  # warm-up
+        print(f"{name:>14} {await run(args.requests):>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=200, help="streamed chunks per request")
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    asyncio.run(bench(parser.parse_args()))
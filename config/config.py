@@ -1,5 +1,141 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
 from pydantic import BaseModel
 
+load_dotenv()
+
+# Logging: level per logger ("Tools=DEBUG,httpx=INFO"), text or json output, and a
+# background writer thread (LOG_ASYNC) so disk writes stay off the request path
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = dict(
+    (name.strip(), level.strip().upper())
+    for name, _, level in (item.partition("=") for item in os.getenv("LOG_LEVELS", "").split(",") if "=" in item)
+)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+
+# Langfuse tracing: sample rate per conversation, per-user overrides and batched export
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_ALWAYS_USERS = set(filter(None, os.getenv("TRACE_ALWAYS_USERS", "").split(",")))
+TRACE_NEVER_USERS = set(filter(None, os.getenv("TRACE_NEVER_USERS", "").split(",")))
+TRACE_FLUSH_AT = int(os.getenv("TRACE_FLUSH_AT", "64"))
+TRACE_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", "5"))
+
+# Admission control for /api/chat (per worker process): concurrent chats, per-conversation
+# limit, bounded wait queue and its deadline, and the overall deadline of one response
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", "48"))
+ADMISSION_MAX_PER_THREAD = int(os.getenv("ADMISSION_MAX_PER_THREAD", "1"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "96"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+CHAT_REQUEST_TIMEOUT = float(os.getenv("CHAT_REQUEST_TIMEOUT", "180"))
+
+# Build the agent in the background at startup instead of on the first chat request
+AGENT_PRELOAD = os.getenv("AGENT_PRELOAD", "true").lower() == "true"
+
+# Size of the thread pool that blocking tool calls (yfinance, requests) are offloaded to
+TOOL_THREAD_POOL_SIZE = int(os.getenv("TOOL_THREAD_POOL_SIZE", "64"))
+
+# Tool calls running at once across all chats, and the time limit of a single tool call
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "32"))
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "30"))
+
+# Bounds of the in-process market data cache shared by all tools
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Seconds a failed upstream fetch is shared with later callers before it is retried
+SINGLEFLIGHT_ERROR_TTL = float(os.getenv("SINGLEFLIGHT_ERROR_TTL", "5"))
+
+# SQLite (WAL) market data tier shared by all worker processes on the host; empty disables it
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", ".cache/market.sqlite")
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+SHARED_CACHE_STALE_TTL = float(os.getenv("SHARED_CACHE_STALE_TTL", str(24 * 60 * 60)))
+SHARED_CACHE_LEASE_TIMEOUT = float(os.getenv("SHARED_CACHE_LEASE_TIMEOUT", "15"))
+
+# On-disk daily price history store used by get_historical_data
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", ".cache/prices")
+PRICE_STORE_MAX_SYMBOLS = int(os.getenv("PRICE_STORE_MAX_SYMBOLS", "256"))
+
+# Default per-call token budget for tool output returned to the LLM
+TOOL_TOKEN_BUDGET = int(os.getenv("TOOL_TOKEN_BUDGET", "1500"))
+
+# Multi-ticker tools: maximum symbols per call and parallel upstream fetches
+BATCH_MAX_TICKERS = int(os.getenv("BATCH_MAX_TICKERS", "25"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+
+# Company name to ticker listing used by get_ticker before falling back to Yahoo search
+SYMBOL_LISTING_PATH = os.getenv("SYMBOL_LISTING_PATH", str(Path(__file__).resolve().parent.parent / "MarketInsight" / "data" / "symbols.csv"))
+SYMBOL_INDEX_REFRESH = float(os.getenv("SYMBOL_INDEX_REFRESH", "300"))
+
+# Background prefetch of the watchlist and recently popular tickers
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_WATCHLIST = [t.strip().upper() for t in os.getenv("PREFETCH_WATCHLIST", "").split(",") if t.strip()]
+PREFETCH_WATCHLIST_PATH = os.getenv("PREFETCH_WATCHLIST_PATH", str(Path(__file__).resolve().parent.parent / "MarketInsight" / "data" / "watchlist.txt"))
+PREFETCH_DATASETS = [d.strip() for d in os.getenv("PREFETCH_DATASETS", "info,news,financials").split(",") if d.strip()]
+# Watchlist tickers are kept warm only for datasets cached at least this long (seconds);
+# short-lived ones such as quotes are refreshed only for tickers users are asking about
+PREFETCH_WATCHLIST_MIN_TTL = float(os.getenv("PREFETCH_WATCHLIST_MIN_TTL", "3600"))
+PREFETCH_HOT_SIZE = int(os.getenv("PREFETCH_HOT_SIZE", "25"))
+PREFETCH_MIN_SCORE = float(os.getenv("PREFETCH_MIN_SCORE", "2"))
+PREFETCH_HALF_LIFE = float(os.getenv("PREFETCH_HALF_LIFE", "900"))
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "5"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+PREFETCH_MAX_PER_CYCLE = int(os.getenv("PREFETCH_MAX_PER_CYCLE", "20"))
+PREFETCH_MIN_HEADROOM = float(os.getenv("PREFETCH_MIN_HEADROOM", "0.5"))
+PREFETCH_WARMUP = os.getenv("PREFETCH_WARMUP", "false").lower() == "true"
+PREFETCH_WARMUP_TIMEOUT = float(os.getenv("PREFETCH_WARMUP_TIMEOUT", "30"))
+
+# Stock screener: fundamentals snapshot of a ticker universe, rebuilt in the background
+SCREENER_ENABLED = os.getenv("SCREENER_ENABLED", "true").lower() == "true"
+SCREENER_UNIVERSE = [t.strip().upper() for t in os.getenv("SCREENER_UNIVERSE", "").split(",") if t.strip()]
+SCREENER_UNIVERSE_PATH = os.getenv("SCREENER_UNIVERSE_PATH", PREFETCH_WATCHLIST_PATH)
+SCREENER_REFRESH_INTERVAL = float(os.getenv("SCREENER_REFRESH_INTERVAL", "900"))
+SCREENER_WORKERS = int(os.getenv("SCREENER_WORKERS", "4"))
+SCREENER_MAX_RESULTS = int(os.getenv("SCREENER_MAX_RESULTS", "25"))
+
+# Shared upstream client: global rate limit, timeouts, retries and circuit breaker
+UPSTREAM_RATE_LIMIT = float(os.getenv("UPSTREAM_RATE_LIMIT", "10"))
+UPSTREAM_BURST = int(os.getenv("UPSTREAM_BURST", "20"))
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "32"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+UPSTREAM_BREAKER_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+UPSTREAM_BREAKER_RESET = float(os.getenv("UPSTREAM_BREAKER_RESET", "30"))
+
+# Conversation checkpointer: in-memory cap, idle eviction and SQLite spill file (empty disables it)
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024)))
+CHECKPOINT_IDLE_TTL = float(os.getenv("CHECKPOINT_IDLE_TTL", "1800"))
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", ".cache/checkpoints.sqlite")
+CHECKPOINT_DB_TTL = float(os.getenv("CHECKPOINT_DB_TTL", str(7 * 24 * 3600)))
+
+# Prompt size limit per model call and how much of a stale tool result is kept as a preview
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "12000"))
+STALE_TOOL_PREVIEW_CHARS = int(os.getenv("STALE_TOOL_PREVIEW_CHARS", "200"))
+
+# Response cache in front of the agent for repeated first-turn prompts
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+ANSWER_CACHE_MAX_TTL = float(os.getenv("ANSWER_CACHE_MAX_TTL", "3600"))
+ANSWER_CACHE_CHUNK_SIZE = int(os.getenv("ANSWER_CACHE_CHUNK_SIZE", "16"))
+# Lifetime of answers that used no market data (only the ticker lookup or no tool); 0 disables caching them
+ANSWER_CACHE_NO_DATA_TTL = float(os.getenv("ANSWER_CACHE_NO_DATA_TTL", "60"))
+
+# Chat streaming: SSE events with coalesced text chunks; off streams raw tokens as before
+STREAM_SSE_ENABLED = os.getenv("STREAM_SSE_ENABLED", "false").lower() == "true"
+STREAM_COALESCE_BYTES = int(os.getenv("STREAM_COALESCE_BYTES", "256"))
+STREAM_COALESCE_INTERVAL = float(os.getenv("STREAM_COALESCE_INTERVAL", "0.03"))
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+
+
 class PromptObject(BaseModel):
     content: str
     id: str
@@ -8,4 +144,4 @@ class PromptObject(BaseModel):
 class RequestObject(BaseModel):
     prompt: PromptObject
     threadId: str
-    responseId: str
\ No newline at end of file
+    responseId: str
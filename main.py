@@ -1,16 +1,76 @@
-import os
-import uvicorn
-from fastapi import FastAPI
-from langfuse import Langfuse
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from langchain_core.messages import SystemMessage, HumanMessage
-from config.config import RequestObject
-from MarketInsight.components.agent import agent
-from MarketInsight.utils.logger import get_logger
+import sys
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from MarketInsight.utils.startup import startup
+
+# Only what serving /health needs is imported here; langchain, the OpenAI client,
+# yfinance and pandas load with the agent on first use (see components/agent.py).
+with startup.phase("web framework"):
+    import uvicorn
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import PlainTextResponse, StreamingResponse
+    from starlette.background import BackgroundTask
+
+with startup.phase("application modules"):
+    from config.config import (
+        RequestObject, TOOL_THREAD_POOL_SIZE, ANSWER_CACHE_ENABLED, AGENT_PRELOAD, CHAT_REQUEST_TIMEOUT,
+        PREFETCH_ENABLED, PREFETCH_WARMUP, PREFETCH_WARMUP_TIMEOUT, SCREENER_ENABLED, STREAM_SSE_ENABLED,
+    )
+    from MarketInsight.components import agent as agent_module
+    from MarketInsight.components.agent import aget_agent, get_agent
+    from MarketInsight.components.admission import admission, supervise, AdmissionRejected
+    from MarketInsight.components.answer_cache import answer_cache, replay
+    from MarketInsight.components.prefetch import prefetcher
+    from MarketInsight.components.screener import screener
+    from MarketInsight.components.streaming import ToolEvent, sse_events
+    from MarketInsight.utils.cache import market_cache
+    from MarketInsight.utils.shared_cache import shared_cache
+    from MarketInsight.utils.upstream import upstream
+    from MarketInsight.utils.tracing import tracer
+    from MarketInsight.utils.metrics import registry, AGENT_TTFT, STREAM_DURATION, STREAM_TOKEN_RATE, ACTIVE_STREAMS
+    from MarketInsight.utils.logger import get_logger
 
 logger = get_logger(__name__)
-app = FastAPI()
+
+
+def preload_agent() -> None:
+    try:
+        get_agent()
+    except Exception as e:
+        # The first chat request retries the build and reports the error
+        logger.error("Failed to build the agent: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync tools are run by the agent through the loop's default executor, so size it
+    # for concurrent chats instead of the small cpu-count based default.
+    executor = ThreadPoolExecutor(max_workers=TOOL_THREAD_POOL_SIZE, thread_name_prefix="tool")
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(executor)
+    if AGENT_PRELOAD:
+        # Build in the background so the first chat does not pay for it; /health is served meanwhile
+        loop.run_in_executor(None, preload_agent)
+    if PREFETCH_ENABLED:
+        if PREFETCH_WARMUP:
+            await loop.run_in_executor(None, prefetcher.warm_up, PREFETCH_WARMUP_TIMEOUT)
+        prefetcher.start()
+    if SCREENER_ENABLED:
+        screener.start()
+    logger.info("Service ready after startup phases %s", startup.summary())
+    yield
+    prefetcher.stop()
+    screener.stop()
+    if agent_module.checkpointer is not None:
+        agent_module.checkpointer.close()
+    tracer.shutdown()
+    executor.shutdown(wait=False)
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,11 +80,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-langfuse = Langfuse(
-    public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-    secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-    host=os.getenv("LANGFUSE_HOST")
-)
+def _checkpointer_stat(field: str) -> float:
+    checkpointer = agent_module.checkpointer
+    return checkpointer.stats()[field] if checkpointer is not None else 0
+
+
+def _tokens_saved() -> float:
+    # The serializer (and pandas with it) is only loaded once the tools are
+    serializer = sys.modules.get("MarketInsight.utils.serializer")
+    return serializer.serialization_stats.snapshot()["tokens_saved"] if serializer else 0
+
+
+registry.gauge("marketinsight_admission_queued", "Chat requests waiting for a slot",
+               lambda: admission.stats()["queued"])
+registry.gauge("marketinsight_market_cache_hit_ratio", "Hit ratio of the market data cache",
+               lambda: market_cache.stats()["hit_ratio"])
+registry.gauge("marketinsight_market_cache_bytes", "Estimated bytes held by the market data cache",
+               lambda: market_cache.stats()["bytes"])
+registry.gauge("marketinsight_shared_cache_hit_ratio", "Hit ratio of the cross-worker market data cache",
+               lambda: shared_cache.stats()["hit_ratio"])
+registry.gauge("marketinsight_answer_cache_hit_ratio", "Hit ratio of the chat answer cache",
+               lambda: answer_cache.stats()["hit_ratio"])
+registry.gauge("marketinsight_checkpointer_bytes", "Serialized conversation state held in memory",
+               lambda: _checkpointer_stat("bytes"))
+registry.gauge("marketinsight_checkpointer_threads", "Conversation threads held in memory",
+               lambda: _checkpointer_stat("threads"))
+registry.gauge("marketinsight_upstream_circuit_open", "1 while the upstream circuit breaker is open",
+               lambda: float(upstream.breaker.state == "open"))
+registry.gauge("marketinsight_prefetch_hot_tickers", "Tickers kept warm by the background prefetcher",
+               lambda: prefetcher.stats()["hot"])
+registry.gauge("marketinsight_screener_tickers", "Tickers in the stock screener snapshot",
+               lambda: screener.stats()["rows"])
+registry.gauge("marketinsight_screener_age_seconds", "Seconds since the stock screener snapshot was rebuilt",
+               lambda: screener.stats()["age"])
+registry.gauge("marketinsight_tool_output_tokens_saved", "Estimated prompt tokens saved by compact tool serialization",
+               _tokens_saved)
 
 
 @app.get("/health")
@@ -33,57 +123,120 @@ async def health_check():
     return {"status": "ok", "message": "Service is running"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def stream_answer(prompt: str, config: dict, events: bool = False):
+    """Stream the agent's response, serving repeated first-turn prompts from the answer cache.
+
+    With ``events``, tool calls are reported as ``ToolEvent``s instead of streaming the
+    tool output as text, and a cached response replays only the final answer.
+    """
+    agent = await aget_agent()
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+    first_turn = ANSWER_CACHE_ENABLED and not (await agent.aget_state(config)).values.get('messages')
+    cached = answer_cache.get(prompt) if first_turn else None
+
+    if cached is not None:
+        logger.info("Answer cache hit for thread %s", config['configurable']['thread_id'])
+        async for chunk in replay(cached["answer"] if events else cached["streamed"]):
+            yield chunk
+        # Record the exchange so follow-up questions in this thread have context
+        await agent.aupdate_state(config, {'messages': [HumanMessage(content=prompt), AIMessage(content=cached["answer"])]},
+                                  as_node='model')
+        return
+
+    streamed, answer, tools_used, tool_failed = "", "", set(), False
+    async for token, _ in agent.astream(
+        {
+            'messages': [HumanMessage(content=prompt)]
+        },
+        stream_mode='messages',
+        config=config
+    ):
+        if isinstance(token, ToolMessage):
+            tools_used.add(token.name)
+            tool_failed = tool_failed or token.status == "error" or str(token.content).startswith("Error")
+            answer = ""
+            if events:
+                yield ToolEvent("tool_end", token.name, token.tool_call_id, token.status)
+        else:
+            answer += token.content
+            if events:
+                for call in getattr(token, "tool_call_chunks", None) or getattr(token, "tool_calls", None) or []:
+                    # Only the first chunk of each streamed call carries its name
+                    if call.get("name"):
+                        yield ToolEvent("tool_start", call["name"], call.get("id"))
+        streamed += token.content
+        if not (events and isinstance(token, ToolMessage)):
+            yield token.content
+
+    if first_turn:
+        answer_cache.put(prompt, streamed, answer, tools_used, tool_failed)
+
+
 @app.post("/api/chat")
-async def chat(request: RequestObject):
+async def chat(request: RequestObject, http_request: Request):
+    try:
+        ticket = await admission.admit(request.threadId)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={'retry-after': str(e.retry_after)})
+
     config = {'configurable': {'thread_id': request.threadId}}
     async def generate():
+        started = time.perf_counter()
+        first_token_at, tokens = None, 0
+        ACTIVE_STREAMS.inc()
+        # None when tracing is off or this conversation is not sampled
+        trace = tracer.start_request(request.prompt.content, request.threadId)
+        error = None
+
+        async def observe(chunks):
+            nonlocal first_token_at, tokens
+            async for chunk in chunks:
+                if isinstance(chunk, str) and chunk:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        AGENT_TTFT.observe(first_token_at - started)
+                    tokens += 1
+                    if trace:
+                        trace.add(chunk)
+                yield chunk
+
         try:
-            # Create a span for the entire request
-            with langfuse.start_as_current_observation(
-                as_type="span", 
-                name="chat-request",
-                input=request.prompt.content
-            ) as span:
-                # Set user_id as metadata
-                span.update(metadata={"user_id": request.threadId})
-                
-                # Create a nested generation for the LLM/agent call
-                with langfuse.start_as_current_observation(
-                    as_type="generation",
-                    name="agent-stream",
-                    model="agentic-workflow",
-                    input=request.prompt.content
-                ) as generation:
-                    
-                    full_response = ""
-                    for token, _ in agent.stream(
-                        {
-                            'messages': [
-                                SystemMessage(content="You are a professional stock market analyst. For every user query, first determine whether a relevant tool can provide accurate or real-time data. If an appropriate tool exists, you must use it before answering. If the user does not provide an exact stock ticker, use the available tool to identify or resolve the correct ticker when required. Only when no suitable tool applies should you respond using your own reasoning and general market knowledge. Never guess, assume, or fabricate any financial data."),
-                                HumanMessage(content=request.prompt.content)
-                            ]
-                        },
-                        stream_mode='messages',
-                        config=config
-                    ):
-                        full_response += token.content
-                        yield token.content
-                    
-                    # Update generation with the complete output
-                    generation.update(output=full_response)
-                
-                # Update span with completion status
-                span.update(output="Request completed successfully")
-                
+            chunks = observe(supervise(stream_answer(request.prompt.content, config, events=STREAM_SSE_ENABLED),
+                                       http_request.receive, CHAT_REQUEST_TIMEOUT))
+            # Off: raw tokens, one write each, exactly as before SSE framing was added
+            async for chunk in (sse_events(chunks) if STREAM_SSE_ENABLED else chunks):
+                yield chunk
         except Exception as e:
-            logger.error(f"Error in chat: {e}")
+            logger.error("Error in chat: %s", e)
+            error = e
             raise
+        finally:
+            ticket.release()
+            if trace:
+                trace.end(error)
+            ACTIVE_STREAMS.dec()
+            finished = time.perf_counter()
+            STREAM_DURATION.observe(finished - started)
+            if first_token_at is not None and finished > first_token_at:
+                STREAM_TOKEN_RATE.observe(tokens / (finished - first_token_at))
     
-    return StreamingResponse(generate(), media_type='text/event-stream',
-        headers={
-            'cache-control': 'no-cache, no-transform', 
-            'connection': 'keep-alive'
-        })
+    headers = {
+        'cache-control': 'no-cache, no-transform', 
+        'connection': 'keep-alive'
+    }
+    if STREAM_SSE_ENABLED:
+        # Ask nginx-style proxies not to buffer the coalesced events again
+        headers['x-accel-buffering'] = 'no'
+    # The background task also frees the slot if the stream never started
+    return StreamingResponse(generate(), media_type='text/event-stream', headers=headers,
+                             background=BackgroundTask(ticket.release))
 
 if __name__ == '__main__':
     logger.info("App Initiated Successfully")